@@ -0,0 +1,138 @@
+"""Measure the HTTP API's throughput with a local asyncio load generator.
+
+    python bench_api.py [--users N] [--clients N] [--requests N] [--write-share 0.2]
+                        [--quests N] [--output results.json]
+
+Starts ``tracker_api`` in-process on a free port over a scratch data
+directory holding ``--users`` synthetic profiles, then runs ``--clients``
+keep-alive connections that send ``--requests`` requests between them, a
+``--write-share`` of them quest completions and undos, the rest profile
+reads.  Reports requests per second and latency percentiles.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import random
+import sys
+import tempfile
+import time
+
+import bench_tracker
+import tracker_api as api
+import tracker_storage as storage
+
+
+async def _request(reader, writer, method, path, body=None):
+    """Send one keep-alive request and return ``(status, payload)``"""
+    raw = json.dumps(body).encode("utf-8") if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(raw)}\r\n"
+                 f"Content-Type: application/json\r\n\r\n".encode("latin-1") + raw)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _client(port, plan, latencies, errors):
+    """Run ``plan`` requests over one connection"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for method, path, body in plan:
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, method, path, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def make_plan(users, task_ids, count, write_share, rng):
+    """Random mix of reads, completions and undos across ``users``"""
+    plan = []
+    for _ in range(count):
+        user = rng.choice(users)
+        if rng.random() >= write_share:
+            plan.append(("GET", f"/users/{user}", None))
+        else:
+            op = rng.choice(("complete", "undo"))
+            plan.append(("POST", f"/users/{user}/{op}", {"task_id": rng.choice(task_ids)}))
+    return plan
+
+
+async def run(args):
+    """Serve the scratch profiles and drive the load; returns the results"""
+    rng = random.Random(args.seed)
+    users = [f"bench{i}" for i in range(args.users)]
+    profile = bench_tracker.synthetic_profile(args.quests, years=0.5, seed=args.seed)
+    for user in users:
+        storage.save_user_data(copy.deepcopy(profile), storage.profile_filename(user))
+    task_ids = [task["id"] for task in profile["daily_tasks"]]
+
+    server = await api.start_server("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    per_client = args.requests // args.clients
+    plans = [make_plan(users, task_ids, per_client, args.write_share, rng) for _ in range(args.clients)]
+    latencies = []
+    errors = []
+    # One request per profile first, so loading from disk is not timed
+    await _client(port, [("GET", f"/users/{user}", None) for user in users], [], errors)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(port, plan, latencies, errors) for plan in plans))
+    elapsed = time.perf_counter() - start
+    server.close()
+    await server.wait_closed()
+
+    latencies.sort()
+
+    def percentile(p):
+        return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000, 3)
+
+    return {"requests": len(latencies), "seconds": round(elapsed, 3),
+            "requests_per_second": round(len(latencies) / elapsed, 1),
+            "p50_ms": percentile(0.5), "p95_ms": percentile(0.95), "p99_ms": percentile(0.99),
+            "errors": len(errors)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--write-share", type=float, default=0.2)
+    parser.add_argument("--quests", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results JSON here")
+    args = parser.parse_args()
+
+    data_dir = storage.DATA_DIR
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        storage.DATA_DIR = scratch_dir
+        try:
+            results = asyncio.run(run(args))
+            storage.flush_pending()
+        finally:
+            storage.DATA_DIR = data_dir
+
+    print(f"{args.users} profiles, {args.clients} clients, {args.write_share:.0%} writes "
+          f"({storage.STORAGE_MODE} storage)\n")
+    for name, value in results.items():
+        print(f"{name:<24}{value:>12}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"settings": vars(args), "storage": storage.STORAGE_MODE, "results": results},
+                      f, indent=4)
+    return 1 if results["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Compare snapshot formats on a synthetic profile: file size, save and load time.
+
+    python bench_snapshot.py [--days N] [--per-day N] [--repeat N]
+"""
+import argparse
+import json
+import time
+
+import bench_tracker
+import tracker_engine as engine
+import tracker_snapshot as snapshot
+
+FORMATS = {
+    "json (indent=4)": (lambda u: json.dumps(u, indent=4).encode(), lambda b: engine.migrate_profile(json.loads(b))),
+    "json (compact)": (lambda u: json.dumps(u, separators=(",", ":")).encode(),
+                       lambda b: engine.migrate_profile(json.loads(b))),
+    "packed": (lambda u: snapshot.dumps(u, "none"), snapshot.loads),
+    "packed + zlib": (lambda u: snapshot.dumps(u, "zlib"), snapshot.loads),
+    "packed + lzma": (lambda u: snapshot.dumps(u, "lzma"), snapshot.loads),
+}
+
+
+def best_of(repeat, func, *args):
+    """Fastest of ``repeat`` calls, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--per-day", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    user = bench_tracker.synthetic_profile(years=args.days / 365, per_day=args.per_day)
+    completions = sum(len(ids) for ids in user["completion_history"].values())
+    print(f"{args.days} days, {completions} completions\n")
+    print(f"{'format':<18}{'bytes':>10}{'save ms':>10}{'load ms':>10}")
+    for name, (dump, load) in FORMATS.items():
+        data = dump(user)
+        assert load(data) == user, name
+        print(f"{name:<18}{len(data):>10}{best_of(args.repeat, dump, user):>10.2f}"
+              f"{best_of(args.repeat, load, data):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
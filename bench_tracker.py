@@ -0,0 +1,265 @@
+"""Time the tracker's hot paths on synthetic profiles and compare against a baseline.
+
+    python bench_tracker.py [--quests N] [--years N] [--per-day N] [--repeat N]
+                            [--difficulty-mix common=4,rare=3,...] [--category-mix uniform]
+                            [--output results.json] [--baseline old.json] [--tolerance 1.25]
+                            [--no-pages]
+
+Results are printed as a table and written as JSON.  With ``--baseline`` each
+benchmark is compared with the same name in an earlier results file, and the
+exit status is 1 if any of them got slower than ``--tolerance`` times the
+baseline.
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import tracker_engine as engine
+import tracker_storage as storage
+
+PAGES = ["views/home.py", "views/quests.py", "views/stats.py",
+         "views/achievements.py", "views/leaderboard.py", "views/data.py", "views/settings.py"]
+
+
+def parse_mix(text, names):
+    """``name=weight,...`` (or ``uniform``) as a weight per name"""
+    if text == "uniform":
+        return {name: 1 for name in names}
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in names:
+            raise ValueError(f"Unknown name in mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def synthetic_profile(quests=20, years=3, per_day=5, difficulty_mix=None, category_mix=None,
+                      now=None, seed=0):
+    """A profile with ``quests`` quests and ``years`` of history
+
+    Quest difficulties and categories are drawn from the weighted mixes
+    (uniform by default), and each day gets between 0 and ``2 * per_day``
+    completions of random quests, replayed through ``apply_completions`` so
+    counters, streaks and achievements match a real history.
+    """
+    rng = random.Random(seed)
+    difficulty_mix = difficulty_mix or {name: 1 for name in engine.DIFFICULTY_EXP}
+    category_mix = category_mix or {name: 1 for name in engine.CATEGORIES}
+    difficulties = rng.choices(list(difficulty_mix), weights=list(difficulty_mix.values()), k=quests)
+    categories = rng.choices(list(category_mix), weights=list(category_mix.values()), k=quests)
+
+    user = engine.new_user_data()
+    for i, (difficulty, category) in enumerate(zip(difficulties, categories)):
+        engine.add_task(user, f"Quest {i}", difficulty, rng.randrange(5, 205, 5), category)
+    ids = [t["id"] for t in user["daily_tasks"]]
+
+    now = now or datetime.now()
+    days = round(years * 365)
+    events = []
+    for offset in range(days, 0, -1):
+        day = (now - timedelta(days=offset)).strftime(engine.DATE_FORMAT)
+        events.extend((day, rng.choice(ids)) for _ in range(rng.randint(0, 2 * per_day)))
+    engine.apply_completions(user, events, now)
+    user["setup_complete"] = True
+    return user
+
+
+def measure(repeat, func, setup=None):
+    """Best and mean wall time of ``repeat`` calls, in milliseconds
+
+    ``setup`` runs untimed before every call and its result is passed on.
+    """
+    times = []
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return {"best_ms": round(min(times) * 1000, 3),
+            "mean_ms": round(sum(times) / len(times) * 1000, 3),
+            "runs": repeat}
+
+
+def bench_engine(user, repeat, now):
+    """Streak, achievement and completion paths of the engine"""
+    results = {}
+    results["get_completion_streak"] = measure(repeat, lambda: engine.get_completion_streak(user, now))
+
+    def stale_streak():
+        profile = copy.copy(user)
+        profile.pop("current_streak", None)
+        return profile
+    results["recompute_streak"] = measure(repeat, lambda p: engine.get_completion_streak(p, now),
+                                          stale_streak)
+    results["check_achievements"] = measure(repeat, lambda: engine.check_achievements(user))
+
+    scratch = copy.deepcopy(user)
+    task_ids = [t["id"] for t in scratch["daily_tasks"]]
+    results["mark_task_complete"] = measure(
+        repeat, lambda task_id: engine.mark_task_complete(scratch, task_id, now),
+        lambda: random.choice(task_ids))
+
+    def completed_task():
+        engine.mark_task_complete(scratch, task_ids[0], now)
+        return task_ids[0]
+    results["undo_task_completion"] = measure(
+        repeat, lambda task_id: engine.undo_task_completion(scratch, task_id, now), completed_task)
+    return results
+
+
+def bench_storage(user, repeat, now):
+    """Snapshot save and load through ``tracker_storage`` in a scratch directory"""
+    results = {}
+    data_dir = storage.DATA_DIR
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        storage.DATA_DIR = scratch_dir
+        try:
+            profile = copy.deepcopy(user)
+            # The first save archives cold history; time the steady state
+            storage.save_user_data(profile, "bench.json")
+            results["save_user_data"] = measure(repeat, lambda: storage.save_user_data(profile, "bench.json"))
+            results["load_user_data"] = measure(repeat, lambda: storage.load_user_data("bench.json"))
+            results["snapshot_bytes"] = os.path.getsize(os.path.join(scratch_dir, "bench.json"))
+        finally:
+            storage.DATA_DIR = data_dir
+    return results
+
+
+def bench_stats(user, repeat, now):
+    """Stats page aggregation with cold caches, skipped without pandas"""
+    try:
+        import tracker_analytics as analytics
+    except ImportError:
+        return {}
+
+    def stats(_):
+        analytics.activity_rows(user, storage.DEFAULT_FILE, now=now)
+        analytics.task_rows(user, storage.DEFAULT_FILE)
+        analytics.category_rows(user, storage.DEFAULT_FILE)
+
+    return {
+        "stats_rows": measure(repeat, stats, analytics._cache.clear),
+        "completions_frame": measure(repeat, lambda _: analytics.completions_frame(user, storage.DEFAULT_FILE),
+                                     analytics._cache.clear),
+    }
+
+
+def bench_pages(user, repeat):
+    """Full script runs of every page through Streamlit's ``AppTest``"""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return {}
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "daily_trackerzz.py")
+    results = {}
+    data_dir = storage.DATA_DIR
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        # Pages save, autosave and index the leaderboard; keep that out of the real data
+        storage.DATA_DIR = scratch_dir
+        try:
+            for page in PAGES:
+                def render(profile):
+                    app = AppTest.from_file(script, default_timeout=60)
+                    # A profile name with no file behind it, so the session keeps this one
+                    app.session_state["profile_file"] = "bench_profile.json"
+                    app.session_state["user_data"] = profile
+                    app.switch_page(page)
+                    app.run()
+                    if app.exception:
+                        raise RuntimeError(f"{page}: {app.exception[0].message}")
+                results[f"page:{os.path.basename(page)[:-3]}"] = measure(repeat, render,
+                                                                         lambda: copy.deepcopy(user))
+            storage.flush_pending()
+        finally:
+            storage.DATA_DIR = data_dir
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Per-benchmark ratio against ``baseline`` and the names that regressed"""
+    ratios = {}
+    regressed = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not isinstance(result, dict) or not isinstance(old, dict) or not old["best_ms"]:
+            continue
+        ratio = result["best_ms"] / old["best_ms"]
+        ratios[name] = round(ratio, 3)
+        if ratio > tolerance:
+            regressed.append(name)
+    return ratios, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quests", type=int, default=20)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--per-day", type=int, default=5)
+    parser.add_argument("--difficulty-mix", default="uniform")
+    parser.add_argument("--category-mix", default="uniform")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-pages", action="store_true", help="skip the AppTest page renders")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    now = datetime.now()
+    difficulty_mix = parse_mix(args.difficulty_mix, engine.DIFFICULTY_EXP)
+    category_mix = parse_mix(args.category_mix, engine.CATEGORIES)
+    user = synthetic_profile(args.quests, args.years, args.per_day, difficulty_mix, category_mix,
+                             now, args.seed)
+
+    results = {}
+    results.update(bench_engine(user, args.repeat, now))
+    results.update(bench_storage(user, args.repeat, now))
+    results.update(bench_stats(user, args.repeat, now))
+    if not args.no_pages:
+        results.update(bench_pages(user, args.repeat))
+
+    report = {
+        "profile": {"quests": args.quests, "years": args.years, "per_day": args.per_day,
+                    "difficulty_mix": difficulty_mix, "category_mix": category_mix, "seed": args.seed,
+                    "completions": user["total_tasks_completed"]},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "at": now.strftime("%Y-%m-%d %H:%M:%S")},
+        "results": results,
+    }
+
+    regressed = []
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)["results"]
+        report["baseline"] = args.baseline
+        report["ratios"], regressed = compare(results, baseline, args.tolerance)
+        report["regressed"] = regressed
+
+    print(f"{args.quests} quests, {args.years} years, {user['total_tasks_completed']} completions\n")
+    print(f"{'benchmark':<28}{'best ms':>10}{'mean ms':>10}{'vs base':>10}")
+    for name, result in results.items():
+        if not isinstance(result, dict):
+            print(f"{name:<28}{result:>10}")
+            continue
+        ratio = report.get("ratios", {}).get(name)
+        flag = " !" if name in regressed else ""
+        print(f"{name:<28}{result['best_ms']:>10.3f}{result['mean_ms']:>10.3f}"
+              f"{(f'{ratio:.2f}x' if ratio else ''):>10}{flag}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Regression tests for tracker_api, through a real server on a free port"""
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracker_api as api
+import tracker_engine as engine
+import tracker_storage as storage
+
+
+async def _request(port, method, path, body=None, headers=()):
+    """``(status, payload)`` of one request on its own connection"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    raw = json.dumps(body).encode() if body is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nContent-Length: {len(raw)}\r\nConnection: close\r\n"
+    head += "".join(f"{name}: {value}\r\n" for name, value in headers)
+    writer.write(head.encode("latin-1") + b"\r\n" + raw)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+def _serve(requests):
+    """Run ``requests(port)`` against a fresh server and return its result"""
+    async def main():
+        server = await asyncio.start_server(api.serve_connection, "127.0.0.1", 0)
+        async with server:
+            return await requests(server.sockets[0].getsockname()[1])
+    return asyncio.run(main())
+
+
+def _saved_profile(tmp_path, monkeypatch, username):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "AUTOSAVE_WINDOW", 0)
+    user = engine.new_user_data()
+    task = engine.add_task(user, "Practice", "rare", 20, "learning")
+    filename = storage.profile_filename(username)
+    assert storage.save_user_data(user, filename)[0]
+    return filename, task["id"]
+
+
+def test_complete_and_undo_round_trip(tmp_path, monkeypatch):
+    filename, task_id = _saved_profile(tmp_path, monkeypatch, "api-player")
+
+    async def requests(port):
+        return [await _request(port, method, f"/users/api-player{action}", body) for method, action, body in (
+            ("GET", "", None),
+            ("GET", "/quests", None),
+            ("POST", "/complete", {"task_id": task_id}),
+            ("GET", "", None),
+            ("POST", "/undo", {"task_id": task_id}),
+        )]
+
+    fresh, quests, completed, profile, undone = _serve(requests)
+    assert quests == (200, {"quests": [{"id": task_id, "name": "Practice", "difficulty": "rare",
+                                        "exp": 30, "category": "learning", "done": False}]})
+    assert completed[0] == 200 and completed[1]["profile"]["completed_today"] == 1
+    assert profile == (200, completed[1]["profile"])
+    assert undone == (200, {"undone": True, "profile": fresh[1]})
+    assert storage.load_user_data(filename)["completion_history"].get(engine.get_today_key(), []) == []
+
+
+def test_request_errors(tmp_path, monkeypatch):
+    _, task_id = _saved_profile(tmp_path, monkeypatch, "api-errors")
+
+    async def requests(port):
+        return [await _request(port, method, path, body) for method, path, body in (
+            ("GET", "/health", None),
+            ("GET", "/nowhere", None),
+            ("GET", "/users/nobody-saved-this", None),
+            ("GET", "/users/api-errors/complete", None),
+            ("POST", "/users/api-errors", None),
+            ("POST", "/users/api-errors/complete", {"task_id": "first"}),
+            ("POST", "/users/api-errors/complete", {"task_id": task_id + 100}),
+            ("POST", "/users/api-errors/undo", [task_id]),
+        )]
+
+    statuses = [status for status, _ in _serve(requests)]
+    assert statuses == [200, 404, 404, 405, 405, 400, 404, 400]
+
+
+def test_token_is_required_when_set(tmp_path, monkeypatch):
+    _saved_profile(tmp_path, monkeypatch, "api-token")
+    monkeypatch.setattr(api, "API_TOKEN", "s3cret")
+
+    async def requests(port):
+        return (await _request(port, "GET", "/users/api-token"),
+                await _request(port, "GET", "/users/api-token", headers=[("Authorization", "Bearer s3cret")]))
+
+    refused, allowed = _serve(requests)
+    assert refused == (401, {"error": "missing or wrong token"})
+    assert allowed[0] == 200
@@ -0,0 +1,86 @@
+"""Regression tests for tracker_engine"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracker_engine as engine
+
+
+def _level_up_loop(level, experience, exp_needed):
+    """The step-by-step level-up loop ``solve_level`` replaces"""
+    gained = 0
+    while experience >= exp_needed:
+        experience -= exp_needed
+        level += 1
+        exp_needed = engine.get_exp_needed_for_level(level)
+        gained += 1
+    return level, experience, exp_needed, gained
+
+
+@pytest.mark.parametrize("level, experience, exp_needed", [
+    (1, 0, 100), (1, 99, 100), (1, 100, 100), (1, 250, 100), (1, 251, 100),
+    (3, 40, 75), (7, 10 ** 6, 400), (120, 10 ** 9 + 7, 6050), (1, 2.5, 100), (4, 1234.75, 250),
+])
+def test_solve_level_matches_the_step_loop(level, experience, exp_needed):
+    assert engine.solve_level(level, experience, exp_needed) == _level_up_loop(level, experience, exp_needed)
+
+
+def test_solve_level_is_exact_at_every_boundary():
+    for experience in range(0, 20000, 7):
+        assert engine.solve_level(1, experience, 100) == _level_up_loop(1, experience, 100)
+
+
+def test_rank_lookup_uses_the_thresholds():
+    for i, rank in enumerate(engine.RANK_SYSTEM):
+        assert engine.get_current_rank(rank["min_points"]) is rank
+        if i:
+            assert engine.get_current_rank(rank["min_points"] - 1) is engine.RANK_SYSTEM[i - 1]
+    assert engine.get_current_rank(10 ** 7) is engine.RANK_SYSTEM[-1]
+
+
+def _profile(quests=(("Run", "legendary", 60, "fitness"), ("Read", "epic", 40, "learning"),
+                     ("Meditate", "rare", 20, "mindfulness"))):
+    user = engine.new_user_data()
+    tasks = [engine.add_task(user, *quest) for quest in quests]
+    return user, [task["id"] for task in tasks]
+
+
+def _derived(user):
+    """Everything an undo is meant to roll back"""
+    fields = {field: user.get(field) for field in engine._RESTORE_FIELDS}
+    return fields, sorted(user["achievements"]), user["completion_history"], engine.get_rollups(user)
+
+
+def test_undo_rolls_back_as_if_the_completion_never_happened():
+    day = datetime(2025, 3, 10)
+    undone, kept = _profile(), _profile()
+    for user, ids in (undone, kept):
+        engine.mark_task_complete(user, ids[0], day.replace(hour=7))
+    engine.mark_task_complete(undone[0], undone[1][1], day.replace(hour=8))
+    for user, ids in (undone, kept):
+        engine.claim_daily_bonus(user, day.replace(hour=9))
+        engine.mark_task_complete(user, ids[2], day.replace(hour=10))
+        engine.mark_task_complete(user, ids[0], day.replace(hour=11))
+
+    assert engine.undo_task_completion(undone[0], undone[1][1], day.replace(hour=12))
+    assert _derived(undone[0]) == _derived(kept[0])
+    assert not engine.undo_task_completion(undone[0], undone[1][1], day.replace(hour=12))
+
+
+def test_undo_everything_returns_to_the_checkpoint():
+    day = datetime(2025, 3, 11)
+    user, ids = _profile()
+    engine.mark_task_complete(user, ids[2], day - timedelta(hours=12))
+    fields, achievements, _, rollups = _derived(user)
+    per_task = dict(rollups["per_task"])
+    for hour, task_id in enumerate(ids * 3, 6):
+        engine.mark_task_complete(user, task_id, day.replace(hour=hour))
+    for task_id in reversed(ids * 3):
+        assert engine.undo_task_completion(user, task_id, day.replace(hour=20))
+    assert _derived(user)[:2] == (fields, achievements)
+    assert user["completion_history"].get(day.strftime(engine.DATE_FORMAT), []) == []
+    assert {k: v for k, v in rollups["per_task"].items() if v} == per_task
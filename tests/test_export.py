@@ -0,0 +1,37 @@
+"""Regression tests for tracker_export"""
+import io
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracker_engine as engine
+import tracker_export as export
+
+
+def _ndjson(rows):
+    return io.BytesIO("".join(json.dumps(row) + "\n" for row in rows).encode("utf-8"))
+
+
+def test_import_rejects_future_days():
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime(engine.DATE_FORMAT)
+    rows = [{"day": "2020-01-01", "task_id": 1}, {"day": tomorrow, "task_id": 1}]
+    with pytest.raises(ValueError, match="line 2: .* is in the future"):
+        list(export.read_completions(_ndjson(rows)))
+
+
+def test_merged_completions_keep_their_timestamps():
+    user = engine.new_user_data()
+    task = engine.add_task(user, "Walk", "common", 10, "fitness")
+    day = (datetime.now() - timedelta(days=3)).replace(hour=8, minute=0, second=0, microsecond=0)
+    stamps = [int((day + timedelta(hours=hours)).timestamp()) for hours in (4, 1)]
+    rows = [{"day": day.strftime(engine.DATE_FORMAT), "task_id": task["id"], "at": at} for at in stamps]
+
+    result = export.merge_completions(user, export.read_completions(_ndjson(rows)))
+    assert result["applied"] == 2
+    assert user["completion_times"][day.strftime(engine.DATE_FORMAT)] == sorted(stamps)
+    assert export.merge_completions(user, export.read_completions(_ndjson(rows)))["applied"] == 0
@@ -0,0 +1,87 @@
+"""Regression tests for tracker_snapshot and schema migrations"""
+import json
+import os
+import sys
+import zlib
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracker_engine as engine
+import tracker_snapshot as snapshot
+
+
+def _played_profile(days=40):
+    user = engine.new_user_data()
+    ids = [engine.add_task(user, *quest)["id"] for quest in
+           (("Swim", "epic", 30, "fitness"), ("Paint", "common", 15, "creativity"))]
+    start = datetime(2025, 1, 5, 7)
+    for offset in range(days):
+        for i, task_id in enumerate(ids[:1 + offset % 2]):
+            engine.mark_task_complete(user, task_id, start + timedelta(days=offset, hours=i))
+    return user
+
+
+@pytest.mark.parametrize("codec", sorted(snapshot.CODECS))
+def test_snapshot_round_trip(codec):
+    user = _played_profile()
+    data = snapshot.dumps(user, codec)
+    assert snapshot.is_packed(data)
+    assert snapshot.loads(data) == json.loads(json.dumps(user))
+
+
+def test_segment_round_trip():
+    user = _played_profile()
+    lists = {"completion_history": user["completion_history"], "completion_times": user["completion_times"],
+             "checkpoints": {row[0]: row[1:] for row in user["checkpoints"]}}
+    assert snapshot.unpack_segment(snapshot.pack_segment(lists)) == lists
+
+
+def test_v3_snapshots_still_load():
+    user = _played_profile(10)
+    history = user["completion_history"]
+    rollups = engine.get_rollups(user)
+    scalars = {k: v for k, v in user.items()
+               if k not in ("completion_history", "completion_times", "checkpoints")}
+    scalars["schema_version"] = 3
+    scalars["rollups"] = {k: v for k, v in rollups.items() if k not in snapshot.DAY_ROLLUPS}
+    scalars = json.dumps(scalars).encode()
+    days = sorted(history)
+    columns = [[datetime.strptime(day, engine.DATE_FORMAT).toordinal() for day in days],
+               [len(history[day]) for day in days], [t for day in days for t in history[day]]]
+    for name in snapshot.DAY_ROLLUPS:
+        counter = rollups[name]
+        columns += [[datetime.strptime(day, engine.DATE_FORMAT).toordinal() for day in counter],
+                    list(counter.values())]
+    body = snapshot._V3_SIZES.pack(len(scalars), len(days), len(columns[2]),
+                                   *(len(rollups[name]) for name in snapshot.DAY_ROLLUPS))
+    body += scalars + b"".join(snapshot._int_array(column).tobytes() for column in columns)
+    data = snapshot._HEADER.pack(snapshot.MAGIC, 3, snapshot.CODECS["zlib"]) + zlib.compress(body)
+
+    loaded = snapshot.loads(data)
+    assert loaded["schema_version"] == engine.SCHEMA_VERSION
+    assert loaded["completion_history"] == history
+    assert loaded["rollups"] == json.loads(json.dumps(rollups))
+    assert loaded["checkpoints"] == []
+
+
+def test_legacy_json_profile_is_migrated():
+    user = _played_profile(5)
+    legacy = {k: v for k, v in user.items()
+              if k not in ("schema_version", "next_task_id", "rollups", "current_streak", "last_active_day",
+                           "season_exp", "checkpoints", "completion_times")}
+    loaded = snapshot.loads(json.dumps(legacy).encode())
+
+    assert loaded["schema_version"] == engine.SCHEMA_VERSION
+    assert loaded["next_task_id"] == user["next_task_id"]
+    assert loaded["rollups"]["per_task"] == user["rollups"]["per_task"]
+    assert loaded["season_exp"] == sum(user["rollups"]["exp_per_day"].values())
+    assert loaded["current_streak"] == user["current_streak"]
+    assert loaded["checkpoints"] == []
+
+
+def test_newer_schema_is_refused():
+    with pytest.raises(ValueError, match="newer than this app"):
+        engine.migrate_profile({"schema_version": engine.SCHEMA_VERSION + 1})
@@ -0,0 +1,207 @@
+"""Regression tests for tracker_storage"""
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracker_engine as engine
+import tracker_storage as storage
+
+
+@pytest.fixture(autouse=True)
+def _flush_queued_writes(monkeypatch):
+    """Write queued leaderboard scores while the test's ``DATA_DIR`` is still set"""
+    yield
+    storage.flush_pending()
+
+
+def test_saving_profile_named_leaderboard_does_not_deadlock(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    filename = storage.profile_filename("Leaderboard")
+    user = engine.new_user_data()
+    result = []
+    saver = threading.Thread(target=lambda: result.append(storage.save_user_data(user, filename)),
+                             daemon=True)
+    saver.start()
+    saver.join(10)
+    assert not saver.is_alive(), "save_user_data hung on the leaderboard lock"
+    assert result[0][0]
+    top, position, size = storage.leaderboard_view("level", filename)
+    assert position == 1 and size == 1
+
+
+def test_archived_checkpoint_rows_still_answer_profile_on(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    filename = storage.profile_filename("lookback")
+    user = engine.new_user_data()
+    task = engine.add_task(user, "Run", "common", 10, "fitness")
+    start = datetime.now() - timedelta(days=200)
+    for offset in range(200):
+        engine.mark_task_complete(user, task["id"], start + timedelta(days=offset, hours=9))
+    days = [(start + timedelta(days=offset)).strftime(engine.DATE_FORMAT) for offset in range(-1, 200, 9)]
+    expected = [engine.profile_on(user, day) for day in days]
+
+    assert storage.save_user_data(user, filename)[0]
+    assert len(user["checkpoints"]) <= storage.HOT_DAYS + 1
+    loaded = storage.load_user_data(filename)
+    assert [storage.profile_on(loaded, day, filename) for day in days] == expected
+
+
+def test_archived_days_keep_their_timestamps(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    filename = storage.profile_filename("stamps")
+    user = engine.new_user_data()
+    task = engine.add_task(user, "Read", "common", 10, "learning")
+    start = datetime.now() - timedelta(days=200)
+    stamps = []
+    for offset in range(200):
+        at = start + timedelta(days=offset, hours=7)
+        engine.mark_task_complete(user, task["id"], at)
+        stamps.append(int(at.timestamp()))
+
+    assert storage.save_user_data(user, filename)[0]
+    assert len(user["completion_times"]) <= storage.HOT_DAYS + 1
+    loaded = storage.load_user_data(filename)
+    assert [at for _, _, day_stamps in storage.history_days(loaded, filename) for at in day_stamps] == stamps
+
+
+def _sqlite(tmp_path, monkeypatch):
+    """Point sqlite storage at a fresh database under ``tmp_path``"""
+    monkeypatch.setattr(storage, "STORAGE_MODE", "sqlite")
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "DB_PATH", str(tmp_path / "tracker.db"))
+    monkeypatch.setattr(storage, "_db", None)
+
+
+def test_deleted_sqlite_profile_leaves_no_rows(tmp_path, monkeypatch):
+    _sqlite(tmp_path, monkeypatch)
+    filename = storage.profile_filename("bob")
+    user = engine.new_user_data()
+    task = engine.add_task(user, "Run", "common", 10, "fitness")
+    engine.mark_task_complete(user, task["id"])
+    assert storage.save_user_data(user, filename)[0]
+
+    assert storage.delete_save_file(filename)
+    db = storage._connect()
+    for table in ("profiles", "tasks", "completions", "day_rollups", "checkpoints"):
+        assert db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0, table
+
+
+def test_sqlite_load_reads_only_the_hot_window(tmp_path, monkeypatch):
+    _sqlite(tmp_path, monkeypatch)
+    filename = storage.profile_filename("window")
+    user = engine.new_user_data()
+    task = engine.add_task(user, "Stretch", "rare", 20, "wellness")
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=200)
+    stamps = []
+    for offset in range(201):
+        if offset != 50:
+            at = start + timedelta(days=offset, hours=6)
+            engine.mark_task_complete(user, task["id"], at)
+            stamps.append(int(at.timestamp()))
+    days = [(start + timedelta(days=offset)).strftime(engine.DATE_FORMAT) for offset in range(0, 201, 13)]
+    expected = [engine.profile_on(user, day) for day in days]
+    assert storage.save_user_data(user, filename)[0]
+
+    loaded = storage.load_user_data(filename)
+    assert len(loaded["completion_history"]) <= storage.HOT_DAYS + 1
+    assert loaded["archive"]["run"] == 200 - len(loaded["completion_history"]) - 50
+    engine.recompute_streak(loaded)
+    assert loaded["current_streak"] == 150
+    assert [at for _, _, day_stamps in storage.history_days(loaded, filename) for at in day_stamps] == stamps
+    assert [storage.profile_on(loaded, day, filename) for day in days] == expected
+
+    # A full save of the trimmed profile keeps the cold rows
+    assert storage.save_user_data(loaded, filename)[0]
+    again = storage.load_user_data(filename)
+    assert sum(len(ids) for _, ids, _ in storage.history_days(again, filename)) == 200
+
+
+def test_completions_per_day_reaches_into_the_archive(tmp_path, monkeypatch):
+    for mode in ("json", "sqlite"):
+        data_dir = tmp_path / mode
+        data_dir.mkdir()
+        if mode == "sqlite":
+            _sqlite(data_dir, monkeypatch)
+        else:
+            monkeypatch.setattr(storage, "DATA_DIR", str(data_dir))
+        filename = storage.profile_filename("ranges")
+        user = engine.new_user_data()
+        task = engine.add_task(user, "Journal", "common", 10, "mindfulness")
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=150)
+        for offset in range(0, 151, 2):
+            engine.mark_task_complete(user, task["id"], start + timedelta(days=offset, hours=8))
+        assert storage.save_user_data(user, filename)[0]
+
+        loaded = storage.load_user_data(filename)
+        first, last = (start + timedelta(days=40)).strftime(engine.DATE_FORMAT), \
+            (start + timedelta(days=100)).strftime(engine.DATE_FORMAT)
+        assert loaded["archive"]["before"] > first, mode
+        expected = {(start + timedelta(days=offset)).strftime(engine.DATE_FORMAT): 1
+                    for offset in range(40, 101, 2)}
+        assert storage.completions_per_day(loaded, first, last, filename) == expected, mode
+
+
+def test_pending_autosave_does_not_overwrite_a_newer_save(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "AUTOSAVE_WINDOW", 60)
+    filename = storage.profile_filename("shared")
+    user = engine.new_user_data()
+    assert storage.save_user_data(user, filename)[0]
+    engine.add_task(user, "Stale", "common", 10, "productivity")
+    assert storage.mark_dirty(user, filename)[0]
+
+    # Another process saves its own copy while our change is still pending
+    other = engine.new_user_data()
+    engine.add_task(other, "Newer", "epic", 40, "creativity")
+    path = tmp_path / filename
+    path.write_bytes(storage._serialize_snapshot(other))
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10 ** 9))
+
+    loaded = storage.load_user_data(filename)
+    assert [task["name"] for task in loaded["daily_tasks"]] == ["Newer"]
+    assert filename not in storage._dirty
+
+
+def test_log_appends_queue_one_leaderboard_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_MODE", "log")
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "AUTOSAVE_WINDOW", 60)
+    writes = []
+    write_leaderboard = storage._write_leaderboard
+    monkeypatch.setattr(storage, "_write_leaderboard", lambda index: (writes.append(1), write_leaderboard(index)))
+    filename = storage.profile_filename("clicker")
+    user = engine.new_user_data()
+    task = engine.add_task(user, "Sketch", "legendary", 80, "creativity")
+    for op in ("complete", "undo") * 3:
+        event = engine.make_event(op, task_id=task["id"])
+        engine.apply_event(user, event)
+        assert storage.append_event(user, event, filename)[0]
+    assert not writes
+
+    top, position, size = storage.leaderboard_view("level", filename)
+    assert len(writes) == 1 and position == 1 and size == 1
+
+
+def test_sqlite_keeps_quest_order_after_deletes(tmp_path, monkeypatch):
+    _sqlite(tmp_path, monkeypatch)
+    filename = storage.profile_filename("order")
+    user = engine.new_user_data()
+    assert storage.save_user_data(user, filename)[0]
+    for name in ("a", "b", "c", "d", "e"):
+        event = engine.make_event("add_task", name=name, difficulty="common", exp=10, category="learning")
+        engine.apply_event(user, event)
+        assert storage.record_change(user, event, filename)[0]
+    for name in ("b", "e", "a"):
+        task_id = next(task["id"] for task in user["daily_tasks"] if task["name"] == name)
+        event = engine.make_event("delete_task", task_id=task_id)
+        engine.apply_event(user, event)
+        assert storage.record_change(user, event, filename)[0]
+
+    assert [task["name"] for task in user["daily_tasks"]] == ["c", "d"]
+    assert storage.load_user_data(filename)["daily_tasks"] == user["daily_tasks"]
+    assert engine.get_task_index(user) == {task["id"]: task for task in user["daily_tasks"]}
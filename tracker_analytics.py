@@ -0,0 +1,234 @@
+"""Vectorized history analytics for the Stats page.
+
+The whole completion history, archived days included, is flattened into a
+long-format DataFrame (one row per completion) and the Tasks and Categories
+tabs are ``value_counts`` over it.  Derived rows are cached per profile and
+keyed by ``history_version``, which the engine bumps on every history or
+quest mutation, so reopening Stats on an unchanged profile costs a dict
+lookup.  The archived part of the frame only changes when days are moved
+out of memory, so it is cached on the archive's size instead.
+
+The activity chart and calendar read their date window with one
+``storage.completions_per_day`` range query.  Streak and weekday views work
+on integer day ordinals: the ``per_day`` counter (which still covers days
+moved to the cold archive) is converted to sorted ordinal / count arrays
+once per version, and runs of consecutive days are then plain NumPy
+arithmetic.
+"""
+from collections import OrderedDict
+from datetime import date, datetime
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+import tracker_engine as engine
+import tracker_storage as storage
+
+CACHE_SIZE = 64
+FRAME_COLUMNS = ["date", "task_id", "category", "difficulty", "exp"]
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+# Ordinal of 1970-01-01, where numpy's datetime64[D] counts from
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# (id(user), name) -> (user, history_version, extra key, value)
+_cache = OrderedDict()
+
+
+def _cached(user, name, build, extra=None, versioned=True):
+    """Return ``build()`` memoized on the profile's history version
+
+    With ``versioned=False`` only ``extra`` decides when to rebuild.
+    """
+    version = user.get("history_version", 0) if versioned else None
+    key = (id(user), name)
+    entry = _cache.get(key)
+    if entry is not None and entry[0] is user and entry[1] == version and entry[2] == extra:
+        _cache.move_to_end(key)
+        return entry[3]
+
+    value = build()
+    _cache[key] = (user, version, extra, value)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return value
+
+
+def _history_frame(days):
+    """``(date, task_id)`` frame of ``(day, task ids, timestamps)`` rows"""
+    days = [(day, task_ids) for day, task_ids, _ in days]
+    lengths = np.fromiter((len(task_ids) for _, task_ids in days), dtype=np.int64, count=len(days))
+    dates = np.repeat(np.array([day for day, _ in days], dtype=object), lengths)
+    task_ids = np.fromiter(chain.from_iterable(task_ids for _, task_ids in days),
+                           dtype=np.int64, count=int(lengths.sum()))
+    return pd.DataFrame({"date": pd.to_datetime(dates, format=engine.DATE_FORMAT), "task_id": task_ids})
+
+
+def _archived_frame(user, filename):
+    """``(date, task_id)`` frame of the archived days, reread only when the archive grows"""
+    before = user.get("archive", {}).get("before")
+    # ``per_day`` still counts archived days, so this changes whenever days
+    # are moved out of memory, even under an unchanged cutoff
+    archived = sum(engine.get_rollups(user)["per_day"].values()) - \
+        sum(len(task_ids) for task_ids in user["completion_history"].values())
+    return _cached(user, "archived_frame",
+                   lambda: _history_frame(storage.archived_days(user, filename)),
+                   extra=(before, archived, filename), versioned=False)
+
+
+def _build_completions_frame(user, filename):
+    """Stack archived and hot completions and join quest attributes"""
+    hot = _history_frame((day, task_ids, ()) for day, task_ids in sorted(user["completion_history"].items()))
+    frame = pd.concat([_archived_frame(user, filename), hot], ignore_index=True)
+
+    tasks = pd.DataFrame(user["daily_tasks"], columns=["id", "category", "difficulty"]).astype({"id": np.int64})
+    tasks["category"] = tasks["category"].fillna("other")
+    tasks["exp"] = [engine.get_task_exp(task) for task in user["daily_tasks"]]
+    # Completions of deleted quests keep NaN attributes and drop out of the
+    # task and category views
+    frame = frame.join(tasks.set_index("id"), on="task_id")
+    return frame[FRAME_COLUMNS]
+
+
+def completions_frame(user, filename):
+    """Long-format DataFrame with one row per completion, archived days included"""
+    return _cached(user, "frame", lambda: _build_completions_frame(user, filename), extra=filename)
+
+
+def day_counts(user):
+    """Sorted day ordinals with at least one completion, and their counts"""
+    def build():
+        per_day = engine.get_rollups(user)["per_day"]
+        days = pd.to_datetime(pd.Index(per_day.keys(), dtype=object), format=engine.DATE_FORMAT)
+        ordinals = days.to_numpy(dtype="datetime64[D]").astype(np.int64) + EPOCH_ORDINAL
+        counts = np.fromiter(per_day.values(), dtype=np.int64, count=len(per_day))
+        order = np.argsort(ordinals)
+        return ordinals[order], counts[order]
+
+    return _cached(user, "day_counts", build)
+
+
+def _date_labels(ordinals):
+    """Date keys of an ordinal array, formatted by NumPy in one call"""
+    return np.datetime_as_string((ordinals - EPOCH_ORDINAL).astype("datetime64[D]"))
+
+
+def _today(now=None):
+    """Ordinal of today"""
+    return (now or datetime.now()).date().toordinal()
+
+
+def _window_counts(user, window, filename):
+    """Completions on each ordinal of ``window``, zero for inactive days
+
+    Read with one ``storage.completions_per_day`` range query, so archived
+    days are only touched when the window reaches them.
+    """
+    labels = _date_labels(window).tolist()
+    counts = storage.completions_per_day(user, labels[0], labels[-1], filename)
+    return np.fromiter((counts.get(label, 0) for label in labels), dtype=np.int64, count=len(labels))
+
+
+def activity_rows(user, filename, days=30, now=None):
+    """``(date, completions)`` for the last ``days`` days, oldest first"""
+    end = _today(now)
+
+    def build():
+        window = np.arange(end - days + 1, end + 1)
+        return tuple(zip(_date_labels(window).tolist(), _window_counts(user, window, filename).tolist()))
+
+    return _cached(user, "activity", build, extra=(end, days))
+
+
+def calendar_rows(user, start, end, filename):
+    """Weeks x weekdays heatmap of ``[start, end]`` (dates)
+
+    Returns ``(week labels, grid)`` where ``grid[weekday][week]`` is the
+    completion count, or None for days outside the range.
+    """
+    first, last = start.toordinal(), end.toordinal()
+
+    def build():
+        # Weeks start on the Monday on or before ``first``; ordinal 1 is a Monday
+        monday = first - (first - 1) % 7
+        weeks = (last - monday) // 7 + 1
+        grid = np.full(weeks * 7, np.nan)
+        window = np.arange(first, last + 1)
+        grid[window - monday] = _window_counts(user, window, filename)
+        grid = grid.reshape(weeks, 7).T
+        labels = _date_labels(monday + 7 * np.arange(weeks)).tolist()
+        return tuple(labels), tuple(tuple(None if np.isnan(v) else int(v) for v in row) for row in grid)
+
+    return _cached(user, "calendar", build, extra=(first, last))
+
+
+def streak_runs(user):
+    """``(start ordinals, lengths)`` of every run of consecutive active days"""
+    def build():
+        ordinals, _ = day_counts(user)
+        if not len(ordinals):
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        starts = np.flatnonzero(np.diff(ordinals, prepend=ordinals[0] - 2) != 1)
+        lengths = np.diff(starts, append=len(ordinals))
+        return ordinals[starts], lengths
+
+    return _cached(user, "streak_runs", build)
+
+
+def streak_summary(user, now=None):
+    """Longest run ever, current run and ``(length, runs)`` distribution rows"""
+    today = _today(now)
+
+    def build():
+        _, lengths = streak_runs(user)
+        if not len(lengths):
+            return {"longest": 0, "current": 0, "runs": 0, "distribution": ()}
+        # The engine's streak, which counts only a run that reaches today
+        current = engine.get_completion_streak(user, now)
+        sizes, runs = np.unique(lengths, return_counts=True)
+        return {"longest": int(lengths.max()), "current": current, "runs": len(lengths),
+                "distribution": tuple(zip(sizes.tolist(), runs.tolist()))}
+
+    return _cached(user, "streak_summary", build, extra=today)
+
+
+def weekday_rows(user, now=None):
+    """``(weekday, share of those days active, average completions)`` rows
+
+    Rates are over every day from the first active day to today.
+    """
+    today = _today(now)
+
+    def build():
+        ordinals, counts = day_counts(user)
+        if not len(ordinals):
+            return ()
+        span = np.arange(ordinals[0], max(today, ordinals[-1]) + 1)
+        weekdays = (span - 1) % 7
+        days = np.bincount(weekdays, minlength=7)
+        active = np.bincount((ordinals - 1) % 7, minlength=7)
+        completions = np.bincount((ordinals - 1) % 7, weights=counts, minlength=7)
+        return tuple((name, round(float(active[i] / days[i]), 3) if days[i] else 0.0,
+                      round(float(completions[i] / days[i]), 2) if days[i] else 0.0)
+                     for i, name in enumerate(WEEKDAYS))
+
+    return _cached(user, "weekdays", build, extra=today)
+
+
+def task_rows(user, filename):
+    """``(quest, completions, difficulty)`` for every current quest"""
+    def build():
+        counts = completions_frame(user, filename)["task_id"].value_counts()
+        return tuple((task["name"], int(counts.get(task["id"], 0)), task["difficulty"])
+                     for task in user["daily_tasks"])
+
+    return _cached(user, "tasks", build, extra=filename)
+
+
+def category_rows(user, filename):
+    """``(category, completions)`` for quests that still exist"""
+    def build():
+        counts = completions_frame(user, filename)["category"].value_counts(sort=False)
+        return tuple((category, int(count)) for category, count in counts.items())
+
+    return _cached(user, "categories", build, extra=filename)
@@ -0,0 +1,292 @@
+"""Headless HTTP API for the Daily Tracker, on asyncio and the standard library only.
+
+    python tracker_api.py [--host 127.0.0.1] [--port 8765]
+
+Endpoints (JSON in and out; ``<user>`` is the username of ``?user=`` in the
+app, ``-`` for the default profile):
+
+    GET  /health
+    GET  /metrics                    trace counters, Prometheus text format
+    GET  /users/<user>               level, rank, streak and today's progress
+    GET  /users/<user>/quests        quests with today's completion state
+    POST /users/<user>/complete      {"task_id": 3}
+    POST /users/<user>/undo          {"task_id": 3}
+    POST /users/<user>/bonus
+
+Profiles come from the same store and ``ProfileCache`` as the Streamlit app,
+and mutations are the app's events, persisted with ``record_change``.
+Connections are served concurrently (with keep-alive); writes to one profile
+are serialized by an ``asyncio.Lock`` and run, like every storage call, in
+the default thread pool so the event loop never waits on the disk.  With
+``TRACKER_API_TOKEN`` set, requests need ``Authorization: Bearer <token>``.
+``bench_api.py`` measures the throughput.
+"""
+import argparse
+import asyncio
+import json
+import os
+from functools import partial
+from urllib.parse import unquote, urlsplit
+
+import tracker_engine as engine
+import tracker_scheduler as scheduler
+import tracker_storage as storage
+import tracker_trace as trace
+
+API_HOST = os.environ.get("TRACKER_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("TRACKER_API_PORT", "8765"))
+API_TOKEN = os.environ.get("TRACKER_API_TOKEN", "")
+MAX_BODY = 64 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    """Error answered with ``status`` and a JSON ``{"error": message}`` body"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Profile access
+
+_cache = storage.ProfileCache()
+# File name -> asyncio.Lock serializing that profile's writes
+_write_locks = {}
+
+
+def _load(filename):
+    """Shared profile of ``filename`` rolled over to today; ApiError if never saved"""
+    user = _cache.get(filename)
+    if user is None:
+        raise ApiError(404, "no such profile")
+    if user.get("last_rollover") != engine.get_today_key():
+        scheduler.roll_over(user, filename)
+    return user
+
+
+def _summary(user):
+    """Level, rank and streak of a profile"""
+    today = user["completion_history"].get(engine.get_today_key(), [])
+    return {
+        "level": user["level"],
+        "experience": user["experience"],
+        "exp_needed": user["exp_needed"],
+        "rank": user["rank"],
+        "rank_points": user["rank_points"],
+        "season": user["current_season"],
+        "streak": engine.get_completion_streak(user),
+        "best_streak": user.get("best_streak", 0),
+        "completed_today": len(today),
+        "quests": len(user["daily_tasks"]),
+        "bonus_claimed": user.get("last_bonus_date") == engine.get_today_key(),
+    }
+
+
+def read_profile(filename):
+    """Summary of a profile"""
+    user = _load(filename)
+    with storage.profile_lock(filename):
+        return _summary(user)
+
+
+def read_quests(filename):
+    """Quests of a profile and whether each is done today"""
+    user = _load(filename)
+    with storage.profile_lock(filename):
+        done = set(user["completion_history"].get(engine.get_today_key(), []))
+        return {"quests": [dict(task, exp=engine.get_task_exp(task), done=task["id"] in done)
+                           for task in user["daily_tasks"]]}
+
+
+def commit(user, filename, op, **fields):
+    """Apply and persist one event, as the app's ``commit_event`` does"""
+    event = engine.make_event(op, **fields)
+    with storage.profile_lock(filename):
+        result = engine.apply_event(user, event)
+        storage.record_change(user, event, filename)
+        return result, _summary(user)
+
+
+def complete(filename, task_id):
+    """Complete a quest for today"""
+    user = _load(filename)
+    if task_id not in engine.get_task_index(user):
+        raise ApiError(404, "no such quest")
+    (leveled_up, achievements, challenges), summary = commit(user, filename, "complete", task_id=task_id)
+    return {"leveled_up": leveled_up, "achievements": achievements, "challenges": challenges,
+            "profile": summary}
+
+
+def undo(filename, task_id):
+    """Undo today's completion of a quest"""
+    undone, summary = commit(_load(filename), filename, "undo", task_id=task_id)
+    return {"undone": undone, "profile": summary}
+
+
+def claim_bonus(filename):
+    """Claim today's bonus"""
+    claimed, summary = commit(_load(filename), filename, "bonus")
+    return {"claimed": claimed, "profile": summary}
+
+
+# HTTP
+
+def _task_id(body):
+    """``task_id`` of a request body"""
+    task_id = body.get("task_id")
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        raise ApiError(400, "task_id must be an integer")
+    return task_id
+
+
+def route(method, path, body):
+    """``(span name, blocking call, profile it writes or False)`` for a request, or ApiError"""
+    parts = [unquote(part) for part in path.strip("/").split("/")]
+    if parts == ["health"]:
+        return "api:health", (lambda: {"status": "ok"}), False
+    if parts == ["metrics"]:
+        return "api:metrics", trace.prometheus_text, False
+    if len(parts) not in (2, 3) or parts[0] != "users":
+        raise ApiError(404, "not found")
+    filename = storage.profile_filename("" if parts[1] == "-" else parts[1])
+    action = parts[2] if len(parts) == 3 else None
+    reads = {None: read_profile, "quests": read_quests}
+    writes = {"complete": lambda: complete(filename, _task_id(body)),
+              "undo": lambda: undo(filename, _task_id(body)),
+              "bonus": lambda: claim_bonus(filename)}
+    if action in reads:
+        if method != "GET":
+            raise ApiError(405, "use GET")
+        return f"api:{action or 'profile'}", partial(reads[action], filename), False
+    if action in writes:
+        if method != "POST":
+            raise ApiError(405, "use POST")
+        return f"api:{action}", writes[action], filename
+    raise ApiError(404, "not found")
+
+
+async def _read_request(reader):
+    """``(method, path, headers, body)`` of the next request, or None at end of stream"""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise ApiError(400, "bad request line") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise ApiError(400, "bad Content-Length") from None
+    if length > MAX_BODY:
+        raise ApiError(413, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), urlsplit(target).path, headers, body
+
+
+def _run(name, call):
+    """Run a request's blocking call in a worker thread, inside its own span
+
+    Spans nest per thread, so they are never opened on the event loop where
+    concurrent requests would interleave them.
+    """
+    with trace.span(name):
+        return call()
+
+
+async def handle(method, path, headers, raw):
+    """Status and response body of one request"""
+    if API_TOKEN and headers.get("authorization") != f"Bearer {API_TOKEN}":
+        raise ApiError(401, "missing or wrong token")
+    try:
+        body = json.loads(raw) if raw else {}
+    except ValueError:
+        raise ApiError(400, "body is not JSON") from None
+    if not isinstance(body, dict):
+        raise ApiError(400, "body must be a JSON object")
+    name, call, writes = route(method, path, body)
+    loop = asyncio.get_running_loop()
+    if not writes:
+        return await loop.run_in_executor(None, _run, name, call)
+    lock = _write_locks.setdefault(writes, asyncio.Lock())
+    async with lock:
+        return await loop.run_in_executor(None, _run, name, call)
+
+
+def _response(status, payload, keep_alive):
+    """Bytes of an HTTP/1.1 response"""
+    if isinstance(payload, str):
+        body, kind = payload.encode("utf-8"), "text/plain; version=0.0.4"
+    else:
+        body, kind = json.dumps(payload, separators=(",", ":")).encode("utf-8"), "application/json"
+    head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {kind}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def serve_connection(reader, writer):
+    """Answer requests on one connection until the client closes it"""
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, raw = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = 200, await handle(method, path, headers, raw)
+            except ApiError as e:
+                status, payload = e.status, {"error": str(e)}
+            except Exception as e:
+                status, payload = 500, {"error": str(e) or type(e).__name__}
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(host=API_HOST, port=API_PORT):
+    """Listening ``asyncio.Server``; also starts the midnight rollover for its profiles"""
+    scheduler.start(_cache.items)
+    return await asyncio.start_server(serve_connection, host, port)
+
+
+async def _main(host, port):
+    server = await start_server(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Daily Tracker API on http://{address[0]}:{address[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily Tracker HTTP API")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_main(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        storage.flush_pending()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Plotly figures for the Daily Tracker, cached on their inputs.
+
+Each builder takes plain hashable inputs (tuples and numbers) and the figure
+is memoized in a shared LRU keyed on ``(chart name, inputs)``.  A rerun where
+a chart's inputs did not change skips both the DataFrame construction and the
+``px.*`` call and reuses the previous figure.
+"""
+import bisect
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import tracker_engine as engine
+import tracker_trace as trace
+
+FIGURE_CACHE_SIZE = 32
+
+_figures = OrderedDict()
+_figures_lock = threading.Lock()
+FIGURE_CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _cached_figure(name, inputs, build):
+    """Return ``build()`` memoized on ``(name, inputs)``"""
+    key = (name, inputs)
+    with _figures_lock:
+        fig = _figures.get(key)
+        if fig is not None:
+            FIGURE_CACHE_STATS["hits"] += 1
+            _figures.move_to_end(key)
+            return fig
+        FIGURE_CACHE_STATS["misses"] += 1
+
+    with trace.span(f"chart:{name}"):
+        fig = build()
+    with _figures_lock:
+        _figures[key] = fig
+        while len(_figures) > FIGURE_CACHE_SIZE:
+            _figures.popitem(last=False)
+            FIGURE_CACHE_STATS["evictions"] += 1
+    return fig
+
+
+def figure_cache_info():
+    """Hit/miss counters plus the current cache size"""
+    return dict(FIGURE_CACHE_STATS, size=len(_figures))
+
+
+def level_progress_figure(experience, exp_needed):
+    """Current vs needed EXP bar chart"""
+    def build():
+        fig = go.Figure(data=[
+            go.Bar(
+                x=["Current", "Needed"],
+                y=[experience, exp_needed],
+                marker_color=['#667eea', '#764ba2']
+            )
+        ])
+        fig.update_layout(height=300, showlegend=False)
+        return fig
+
+    return _cached_figure("level", (experience, exp_needed), build)
+
+
+def rank_progression_figure(rank_points):
+    """Rank thresholds with the ranks already reached highlighted"""
+    # Only how many ranks are reached changes the picture
+    reached = bisect.bisect_right(engine.RANK_THRESHOLDS, rank_points)
+
+    def build():
+        rank_data = []
+        for i, rank in enumerate(engine.RANK_SYSTEM):
+            rank_data.append({
+                "Rank": rank["rank"],
+                "Points": rank["min_points"],
+                "Current": i < reached
+            })
+
+        df_ranks = pd.DataFrame(rank_data)
+        fig = px.bar(
+            df_ranks,
+            x="Rank",
+            y="Points",
+            color="Current",
+            color_discrete_map={True: '#FF6347', False: '#95a5a6'}
+        )
+        fig.update_layout(height=300, showlegend=False)
+        return fig
+
+    return _cached_figure("rank", reached, build)
+
+
+def activity_figure(rows):
+    """Completions per day from ``(date, count)`` rows"""
+    def build():
+        df_heatmap = pd.DataFrame(list(rows), columns=["Date", "Tasks"])
+        fig = px.bar(df_heatmap, x="Date", y="Tasks", color="Tasks", color_continuous_scale="Viridis")
+        fig.update_layout(height=300, xaxis_tickangle=-45)
+        return fig
+
+    return _cached_figure("activity", rows, build)
+
+
+def task_figure(rows):
+    """Completions per quest from ``(quest, completed, difficulty)`` rows"""
+    def build():
+        df_stats = pd.DataFrame(list(rows), columns=["Quest", "Completed", "Difficulty"])
+        df_stats = df_stats.sort_values("Completed", ascending=False)
+        fig = px.bar(df_stats, x="Quest", y="Completed", color="Difficulty",
+                     color_discrete_map=engine.DIFFICULTY_COLORS)
+        fig.update_layout(height=400)
+        return fig
+
+    return _cached_figure("tasks", rows, build)
+
+
+def category_figure(rows):
+    """Completions per category from ``(category, count)`` rows"""
+    def build():
+        df_cat = pd.DataFrame(list(rows), columns=["Category", "Count"])
+        return px.pie(df_cat, values="Count", names="Category")
+
+    return _cached_figure("categories", rows, build)
+
+
+def calendar_figure(labels, grid):
+    """Weeks x weekdays completion heatmap from ``analytics.calendar_rows``"""
+    def build():
+        fig = go.Figure(data=go.Heatmap(
+            z=[list(row) for row in grid],
+            x=list(labels),
+            y=["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
+            colorscale="Viridis",
+            xgap=2,
+            ygap=2,
+            hoverongaps=False,
+            hovertemplate="Week of %{x}, %{y}: %{z} tasks<extra></extra>"
+        ))
+        fig.update_layout(height=260, yaxis_autorange="reversed", xaxis_title="Week of")
+        return fig
+
+    return _cached_figure("calendar", (labels, grid), build)
+
+
+def streak_distribution_figure(rows):
+    """How many streaks of each length from ``(length, runs)`` rows"""
+    def build():
+        df_runs = pd.DataFrame(list(rows), columns=["Days", "Streaks"])
+        fig = px.bar(df_runs, x="Days", y="Streaks")
+        fig.update_layout(height=300)
+        return fig
+
+    return _cached_figure("streaks", rows, build)
+
+
+def weekday_figure(rows):
+    """Share of each weekday with completions from ``(weekday, rate, average)`` rows"""
+    def build():
+        df_days = pd.DataFrame(list(rows), columns=["Weekday", "Active Rate", "Avg Tasks"])
+        fig = px.bar(df_days, x="Weekday", y="Active Rate", color="Avg Tasks",
+                     color_continuous_scale="Viridis", range_y=[0, 1])
+        fig.update_layout(height=300, yaxis_tickformat=".0%")
+        return fig
+
+    return _cached_figure("weekdays", rows, build)
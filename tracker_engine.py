@@ -0,0 +1,1198 @@
+"""Headless progression engine for the Daily Tracker.
+
+Every function here works on a plain profile dict (the same structure the
+Streamlit app keeps in ``st.session_state.user_data``) so the game rules can
+be imported, replayed and benchmarked without a browser.
+"""
+import bisect
+import math
+from collections import OrderedDict, deque
+from datetime import datetime
+from itertools import chain
+
+import tracker_trace as trace
+
+# Rank system
+RANK_SYSTEM = [
+    {"rank": "BRONZE", "min_points": 0, "color": "#CD7F32", "emoji": "🥉"},
+    {"rank": "SILVER", "min_points": 100, "color": "#C0C0C0", "emoji": "🥈"},
+    {"rank": "GOLD", "min_points": 250, "color": "#FFD700", "emoji": "🥇"},
+    {"rank": "PLATINUM", "min_points": 500, "color": "#E5E4E2", "emoji": "💎"},
+    {"rank": "DIAMOND", "min_points": 1000, "color": "#B9F2FF", "emoji": "✨"},
+    {"rank": "MASTER", "min_points": 2000, "color": "#8B0000", "emoji": "🔥"},
+    {"rank": "GRANDMASTER", "min_points": 3500, "color": "#FFD700", "emoji": "⚡"},
+    {"rank": "LEGEND", "min_points": 5000, "color": "#FF6347", "emoji": "👑"},
+]
+
+DIFFICULTY_COLORS = {
+    "common": "#95a5a6",
+    "rare": "#3498db",
+    "epic": "#9b59b6",
+    "legendary": "#f39c12"
+}
+
+DIFFICULTY_EXP = {
+    "common": 1,
+    "rare": 1.5,
+    "epic": 2.5,
+    "legendary": 5
+}
+
+SEASONS = {
+    1: {"name": "The Awakening", "start_date": "Jan 1", "end_date": "Mar 31"},
+    2: {"name": "Rise of Power", "start_date": "Apr 1", "end_date": "Jun 30"},
+    3: {"name": "Dark Shadow", "start_date": "Jul 1", "end_date": "Sep 30"},
+    4: {"name": "Eternal Destiny", "start_date": "Oct 1", "end_date": "Dec 31"},
+}
+
+CATEGORIES = {
+    "fitness": "🏋️",
+    "learning": "📚",
+    "wellness": "💪",
+    "productivity": "⚙️",
+    "mindfulness": "🧠",
+    "creativity": "🎨",
+    "social": "👥",
+    "health": "❤️"
+}
+
+# Each achievement is earned once ``metric`` reaches ``threshold`` (see
+# ``metric_value``; rank thresholds are rank names)
+ACHIEVEMENTS = {
+    "first_task": {"name": "First Step", "description": "Complete your first task", "emoji": "👣",
+                   "metric": "tasks", "threshold": 1},
+    "five_tasks": {"name": "Getting Started", "description": "Complete 5 tasks", "emoji": "🚀",
+                   "metric": "tasks", "threshold": 5},
+    "ten_tasks": {"name": "Growing Stronger", "description": "Complete 10 tasks", "emoji": "💪",
+                  "metric": "tasks", "threshold": 10},
+    "fifty_tasks": {"name": "Warrior", "description": "Complete 50 tasks", "emoji": "⚔️",
+                    "metric": "tasks", "threshold": 50},
+    "hundred_tasks": {"name": "Unstoppable", "description": "Complete 100 tasks", "emoji": "⚡",
+                      "metric": "tasks", "threshold": 100},
+    "week_streak": {"name": "On Fire", "description": "Achieve 7-day streak", "emoji": "🔥",
+                    "metric": "streak", "threshold": 7},
+    "month_streak": {"name": "Unstoppable Force", "description": "Achieve 30-day streak", "emoji": "💥",
+                     "metric": "streak", "threshold": 30},
+    "level_ten": {"name": "Rising Star", "description": "Reach Level 10", "emoji": "⭐",
+                  "metric": "level", "threshold": 10},
+    "rank_gold": {"name": "Golden Champion", "description": "Reach Gold rank", "emoji": "👑",
+                  "metric": "rank", "threshold": "GOLD"},
+    "rank_legend": {"name": "Legendary", "description": "Reach Legend rank", "emoji": "🌟",
+                    "metric": "rank", "threshold": "LEGEND"},
+}
+
+# Daily challenges, each won at most once a day for ``reward`` EXP.  Rules:
+# ``window`` (``count`` completions within ``seconds``), ``all_tasks`` (every
+# quest done today), ``streak`` (``days``-day streak reached today),
+# ``before_hour`` / ``after_hour`` (a completion before / from ``hour``)
+DAILY_CHALLENGES = {
+    "power_hour": {"name": "Power Hour", "description": "Complete 3 tasks in one hour", "reward": 50,
+                   "rule": "window", "count": 3, "seconds": 3600},
+    "perfect_day": {"name": "Perfect Day", "description": "Complete ALL tasks for the day", "reward": 100,
+                    "rule": "all_tasks"},
+    "consistency_king": {"name": "Consistency King", "description": "Complete tasks 3 days in a row",
+                         "reward": 75, "rule": "streak", "days": 3},
+    "early_bird": {"name": "Early Bird", "description": "Complete a task before 9 AM", "reward": 30,
+                   "rule": "before_hour", "hour": 9},
+    "night_owl": {"name": "Night Owl", "description": "Complete a task after 9 PM", "reward": 25,
+                  "rule": "after_hour", "hour": 21},
+}
+CHALLENGE_RULES = ("window", "all_tasks", "streak", "before_hour", "after_hour")
+
+# Profile counters achievements can be defined on, besides the per-category
+# (``category:<name>``) and per-difficulty (``difficulty:<name>``) totals
+ACHIEVEMENT_METRICS = {
+    "tasks": "Tasks completed",
+    "streak": "Current streak (days)",
+    "best_streak": "Best streak (days)",
+    "level": "Level",
+    "rank": "Rank",
+    "rank_points": "Rank points",
+    "exp": "Total EXP earned",
+    "season_exp": "Season EXP",
+}
+
+# Threshold table for bisect-based rank lookups
+RANK_THRESHOLDS = [r["min_points"] for r in RANK_SYSTEM]
+RANK_INDEX = {r["rank"]: i for i, r in enumerate(RANK_SYSTEM)}
+
+DAILY_BONUS_EXP = 25
+TASK_INDEX_CACHE_SIZE = 256
+COMPLETION_RANK_POINTS = 5
+LEVEL_UP_RANK_POINTS = 10
+DATE_FORMAT = "%Y-%m-%d"
+# Counters kept in the per-day checkpoint rows, in row order after the day
+CHECKPOINT_FIELDS = ("level", "experience", "exp_needed", "rank_points", "total_exp_earned",
+                     "season_exp", "total_tasks_completed", "best_streak")
+# Derived fields an undo restores from today's checkpoint before replaying
+_RESTORE_FIELDS = CHECKPOINT_FIELDS + ("rank", "last_level_up", "daily_bonus_claimed", "last_bonus_date")
+SCHEMA_VERSION = 4
+
+# Per-profile id -> task and id -> list position indexes, keyed by id() of the profile dict
+_task_indexes = OrderedDict()
+# Per-profile achievement rule indexes, keyed the same way
+_rule_indexes = OrderedDict()
+# Per-profile rolling challenge state for one day, keyed the same way
+_challenge_states = OrderedDict()
+
+
+def new_user_data():
+    """Create a fresh profile"""
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "current_season": season_for(),
+        "level": 1,
+        "experience": 0,
+        "exp_needed": 100,
+        "rank": "BRONZE",
+        "rank_points": 0,
+        "daily_tasks": [],
+        "next_task_id": 1,
+        "history_version": 0,
+        "revision": 0,
+        "rollups": _empty_rollups(),
+        "completion_history": {},
+        "completion_times": {},
+        "achievements": [],
+        "custom_achievements": {},
+        "custom_challenges": {},
+        "challenges_won": {},
+        "checkpoint": None,
+        "journal": [],
+        "checkpoints": [],
+        "season_history": [],
+        "last_rollover": None,
+        "last_level_up": None,
+        "last_saved": None,
+        "total_tasks_completed": 0,
+        "total_exp_earned": 0,
+        "season_exp": 0,
+        "best_streak": 0,
+        "current_streak": 0,
+        "last_active_day": None,
+        "daily_bonus_claimed": False,
+        "last_bonus_date": None,
+        "setup_complete": False
+    }
+
+
+def get_today_key(now=None):
+    """Get today's date as key"""
+    return (now or datetime.now()).strftime(DATE_FORMAT)
+
+
+def _season_bounds(season):
+    """``(month, day)`` of a season's first and last day"""
+    info = SEASONS[season]
+    start = datetime.strptime(info["start_date"], "%b %d")
+    end = datetime.strptime(info["end_date"], "%b %d")
+    return (start.month, start.day), (end.month, end.day)
+
+
+def season_for(now=None):
+    """Season whose calendar dates contain ``now``"""
+    now = now or datetime.now()
+    for season in SEASONS:
+        start, end = _season_bounds(season)
+        if start <= (now.month, now.day) <= end:
+            return season
+    return min(SEASONS)
+
+
+def get_current_rank(rank_points):
+    """Get current rank based on rank points"""
+    i = bisect.bisect_right(RANK_THRESHOLDS, rank_points) - 1
+    return RANK_SYSTEM[max(i, 0)]
+
+
+def get_next_rank(rank):
+    """Get the rank after ``rank``, or None at the top"""
+    i = RANK_INDEX.get(rank, 0) + 1
+    return RANK_SYSTEM[i] if i < len(RANK_SYSTEM) else None
+
+
+def get_exp_needed_for_level(level):
+    """Calculate EXP needed to reach next level"""
+    return 100 + (level - 1) * 50
+
+
+def get_task_exp(task):
+    """EXP a task is worth once its difficulty multiplier is applied"""
+    return int(task["exp"] * DIFFICULTY_EXP.get(task["difficulty"], 1))
+
+
+def _levels_affordable(level, experience):
+    """How many consecutive level-ups starting at ``level`` ``experience`` pays for
+
+    Level ``level + j`` costs ``a + 50 * j`` with ``a`` the cost of ``level``,
+    so ``k`` levels cost ``25 * k * k + (a - 25) * k``; solve that quadratic
+    for the largest ``k`` that still fits.
+    """
+    b = get_exp_needed_for_level(level) - 25
+    if isinstance(experience, int):
+        k = (math.isqrt(b * b + 100 * experience) - b) // 50
+    else:
+        k = int((math.sqrt(b * b + 100 * experience) - b) // 50)
+    # Nudge away any rounding error from the float branch
+    while k > 0 and 25 * k * k + b * k > experience:
+        k -= 1
+    while 25 * (k + 1) * (k + 1) + b * (k + 1) <= experience:
+        k += 1
+    return k
+
+
+def solve_level(level, experience, exp_needed):
+    """Resolve pending level-ups in one step
+
+    Returns ``(level, experience, exp_needed, levels_gained)`` exactly as the
+    step-by-step loop would leave them: the first level-up costs the stored
+    ``exp_needed``, every later one ``get_exp_needed_for_level``.
+    """
+    if experience < exp_needed:
+        return level, experience, exp_needed, 0
+
+    experience -= exp_needed
+    level += 1
+    gained = 1 + _levels_affordable(level, experience)
+    extra = gained - 1
+    experience -= 25 * extra * extra + (get_exp_needed_for_level(level) - 25) * extra
+    level += extra
+    return level, experience, get_exp_needed_for_level(level), gained
+
+
+def add_experience(user, exp_amount, now=None):
+    """Add experience and handle level up"""
+    user["experience"] += exp_amount
+    user["total_exp_earned"] = user.get("total_exp_earned", 0) + exp_amount
+    user["season_exp"] = user.get("season_exp", 0) + exp_amount
+
+    level, experience, exp_needed, gained = solve_level(
+        user["level"], user["experience"], user["exp_needed"])
+    if gained:
+        user["level"] = level
+        user["experience"] = experience
+        user["exp_needed"] = exp_needed
+        user["rank_points"] += gained * LEVEL_UP_RANK_POINTS
+        user["last_level_up"] = (now or datetime.now()).strftime("%Y-%m-%d %H:%M")
+
+    new_rank = get_current_rank(user["rank_points"])
+    user["rank"] = new_rank["rank"]
+
+    return gained > 0
+
+
+def _day_ordinal(day):
+    """Integer day number of a date key"""
+    return datetime.strptime(day, DATE_FORMAT).toordinal()
+
+
+def _day_key(ordinal):
+    """Date key of an integer day number"""
+    return datetime.fromordinal(ordinal).strftime(DATE_FORMAT)
+
+
+@trace.traced("recompute_streak")
+def recompute_streak(user):
+    """Rebuild current/best streak from the full history, e.g. after an import
+
+    Archived history is summarized by the run that ends on its last active
+    day, so only the hot days are scanned.
+    """
+    active = sorted(_day_ordinal(day) for day, task_ids in user["completion_history"].items() if task_ids)
+    archive = user.get("archive") or {}
+    run = longest = archive.get("run", 0)
+    previous = _day_ordinal(archive["last_active_day"]) if archive.get("last_active_day") else None
+    for ordinal in active:
+        if previous is not None and ordinal <= previous:
+            # Back-filled into the archived range, already counted there
+            continue
+        run = run + 1 if previous == ordinal - 1 else 1
+        longest = max(longest, run)
+        previous = ordinal
+
+    user["current_streak"] = run
+    user["last_active_day"] = _day_key(previous) if previous is not None else None
+    user["best_streak"] = max(user.get("best_streak", 0), longest)
+
+
+def _mark_day_active(user, day):
+    """Extend the streak when ``day`` gets its first completion"""
+    last = user.get("last_active_day")
+    ordinal = _day_ordinal(day)
+    if last is None or ordinal > _day_ordinal(last):
+        continues = last is not None and ordinal - 1 == _day_ordinal(last)
+        user["current_streak"] = user["current_streak"] + 1 if continues else 1
+        user["last_active_day"] = day
+        user["best_streak"] = max(user.get("best_streak", 0), user["current_streak"])
+    else:
+        # Back-filled history can join or split older runs
+        recompute_streak(user)
+
+
+def _mark_day_inactive(user, day):
+    """Shorten the streak when ``day`` loses its last completion"""
+    if "current_streak" in user and day == user["last_active_day"]:
+        user["current_streak"] -= 1
+        user["last_active_day"] = _day_key(_day_ordinal(day) - 1)
+    else:
+        recompute_streak(user)
+
+
+def get_completion_streak(user, today=None):
+    """Get current completion streak"""
+    if "current_streak" not in user:
+        recompute_streak(user)
+    if user["last_active_day"] != get_today_key(today):
+        return 0
+    return user["current_streak"]
+
+
+def get_achievements(user):
+    """Built-in and the profile's own achievement definitions, by id"""
+    custom = user.get("custom_achievements")
+    return dict(ACHIEVEMENTS, **custom) if custom else ACHIEVEMENTS
+
+
+# Value of each plain achievement metric; ``streak`` is passed in
+METRIC_GETTERS = {
+    "tasks": lambda user: user.get("total_tasks_completed", 0),
+    "best_streak": lambda user: user.get("best_streak", 0),
+    "level": lambda user: user["level"],
+    "rank": lambda user: RANK_INDEX.get(user["rank"], 0),
+    "rank_points": lambda user: user["rank_points"],
+    "exp": lambda user: user.get("total_exp_earned", 0),
+    "season_exp": lambda user: user.get("season_exp", 0),
+}
+
+
+def metric_value(user, metric, streak=None):
+    """Current value of an achievement metric"""
+    if metric == "streak":
+        return get_completion_streak(user) if streak is None else streak
+    getter = METRIC_GETTERS.get(metric)
+    if getter is not None:
+        return getter(user)
+    kind, _, name = metric.partition(":")
+    if kind in ("category", "difficulty"):
+        return get_rollups(user)[f"per_{kind}"].get(name, 0)
+    raise ValueError(f"Unknown achievement metric: {metric}")
+
+
+def _rule_threshold(rule):
+    """Numeric threshold of a rule; rank rules name the rank"""
+    threshold = rule["threshold"]
+    if rule["metric"] == "rank" and isinstance(threshold, str):
+        return RANK_INDEX[threshold]
+    return threshold
+
+
+def _build_rule_index(user):
+    """Metric -> ``[thresholds, ids, cursor]`` with rules sorted by threshold
+
+    Every rule before ``cursor`` is already earned, so a check only has to
+    look at the rule under the cursor.
+    """
+    by_metric = {}
+    for ach_id, rule in get_achievements(user).items():
+        by_metric.setdefault(rule["metric"], []).append((_rule_threshold(rule), ach_id))
+    index = {}
+    for metric, rules in by_metric.items():
+        rules.sort()
+        index[metric] = [[t for t, _ in rules], [a for _, a in rules], 0]
+    return index
+
+
+def _get_rule_index(user):
+    """Achievement rule index for a profile, rebuilt only when stale"""
+    earned = user["achievements"]
+    entry = _rule_indexes.get(id(user))
+    if entry is None or entry[0] is not user or entry[1] is not earned:
+        entry = (user, earned, _build_rule_index(user))
+        _rule_indexes[id(user)] = entry
+    _rule_indexes.move_to_end(id(user))
+    while len(_rule_indexes) > TASK_INDEX_CACHE_SIZE:
+        _rule_indexes.popitem(last=False)
+    return entry[2]
+
+
+def completion_metrics(task):
+    """Achievement metrics a completion of ``task`` can move"""
+    return ("tasks", "streak", "best_streak", "level", "rank", "rank_points", "exp", "season_exp",
+            "category:" + (task.get("category") or "other"), "difficulty:" + task["difficulty"])
+
+
+@trace.traced("check_achievements")
+def check_achievements(user, streak=None, metrics=None):
+    """Award every achievement whose threshold has been reached
+
+    Only ``metrics`` (all of them by default) are looked at, and for each
+    only its lowest unearned threshold unless that one is met, so a check
+    costs one comparison per metric however many rules there are.  A jump
+    past several thresholds at once awards all of them.
+    """
+    index = _get_rule_index(user)
+    earned = user["achievements"]
+    awarded = []
+    for metric in index if metrics is None else metrics:
+        rules = index.get(metric)
+        if rules is None:
+            continue
+        thresholds, ach_ids, cursor = rules
+        if cursor == len(thresholds):
+            continue
+        value = metric_value(user, metric, streak)
+        while cursor < len(thresholds) and thresholds[cursor] <= value:
+            if ach_ids[cursor] not in earned:
+                earned.append(ach_ids[cursor])
+                awarded.append(ach_ids[cursor])
+            cursor += 1
+        rules[2] = cursor
+    return awarded
+
+
+def add_custom_achievement(user, name, metric, threshold, emoji="🎯", description=None):
+    """Define (or redefine) a profile's own achievement and award it if already met"""
+    # Rejects unknown metrics before anything is stored
+    metric_value(user, metric, 0)
+    ach_id = "custom:" + "_".join(name.lower().split())
+    user.setdefault("custom_achievements", {})[ach_id] = {
+        "name": name,
+        "description": description or f"Reach {threshold} {ACHIEVEMENT_METRICS.get(metric, metric)}",
+        "emoji": emoji,
+        "metric": metric,
+        "threshold": threshold,
+    }
+    _rule_indexes.pop(id(user), None)
+    return check_achievements(user, metrics=[metric])
+
+
+def delete_custom_achievement(user, ach_id):
+    """Remove a profile's own achievement, earned or not"""
+    if user.get("custom_achievements", {}).pop(ach_id, None) is not None:
+        if ach_id in user["achievements"]:
+            user["achievements"].remove(ach_id)
+        _rule_indexes.pop(id(user), None)
+
+
+def get_challenges(user):
+    """Built-in and the profile's own daily challenge definitions, by id"""
+    custom = user.get("custom_challenges")
+    return dict(DAILY_CHALLENGES, **custom) if custom else DAILY_CHALLENGES
+
+
+def _build_challenge_state(user, day, count=None):
+    """Rolling state of ``day``'s completions (the first ``count`` of them) for the challenge rules
+
+    ``done`` counts today's completions per quest and each ``window`` rule
+    gets a deque of today's timestamps; completions without one are left
+    out of the windows.
+    """
+    tasks_by_id = get_task_index(user)
+    task_ids = user["completion_history"].get(day, [])[:count]
+    done = {}
+    for task_id in task_ids:
+        if task_id in tasks_by_id:
+            done[task_id] = done.get(task_id, 0) + 1
+    stamps = [t for t in _day_times(user, day)[:count] if t]
+    windows = {ch_id: deque(stamps) for ch_id, rule in get_challenges(user).items()
+               if rule["rule"] == "window"}
+    return {"day": day, "count": len(task_ids), "done": done, "windows": windows}
+
+
+def _challenge_state(user, day):
+    """Challenge state of ``day`` for a profile, rebuilt only when stale"""
+    count = len(user["completion_history"].get(day, ()))
+    entry = _challenge_states.get(id(user))
+    if entry is None or entry[0] is not user or entry[1]["day"] != day or entry[1]["count"] != count:
+        entry = (user, _build_challenge_state(user, day))
+        _challenge_states[id(user)] = entry
+    _challenge_states.move_to_end(id(user))
+    while len(_challenge_states) > TASK_INDEX_CACHE_SIZE:
+        _challenge_states.popitem(last=False)
+    return entry[1]
+
+
+def _challenge_met(user, ch_id, rule, state, now, timestamp):
+    """Whether the completion just counted into ``state`` meets a challenge rule"""
+    kind = rule["rule"]
+    if kind == "window":
+        window = state["windows"].setdefault(ch_id, deque())
+        window.append(timestamp)
+        while window[0] <= timestamp - rule["seconds"]:
+            window.popleft()
+        return len(window) >= rule["count"]
+    if kind == "all_tasks":
+        return 0 < len(user["daily_tasks"]) <= len(state["done"])
+    if kind == "streak":
+        return get_completion_streak(user, now) >= rule["days"]
+    if kind == "before_hour":
+        return now.hour < rule["hour"]
+    if kind == "after_hour":
+        return now.hour >= rule["hour"]
+    return False
+
+
+def evaluate_challenges(user, task, now, state):
+    """Count a just-recorded completion of ``task`` and award the challenges it completes
+
+    ``state`` is today's challenge state from before the completion.  Each
+    rule does O(1) amortized work (a window only drops timestamps that slid
+    out of it), and challenges already won today are skipped outright.
+    Returns the ids awarded and whether their EXP caused a level up.
+    """
+    timestamp = int(now.timestamp())
+    state["count"] += 1
+    state["done"][task["id"]] = state["done"].get(task["id"], 0) + 1
+    won = user.setdefault("challenges_won", {})
+    awarded = []
+    leveled_up = False
+    for ch_id, rule in get_challenges(user).items():
+        record = won.get(ch_id)
+        if record is not None and record["last"] == state["day"]:
+            continue
+        if _challenge_met(user, ch_id, rule, state, now, timestamp):
+            record = won.setdefault(ch_id, {"last": None, "count": 0})
+            record["last"] = state["day"]
+            record["count"] += 1
+            leveled_up = add_experience(user, rule["reward"], now) or leveled_up
+            awarded.append(ch_id)
+    return awarded, leveled_up
+
+
+def add_custom_challenge(user, name, rule, reward, description=None, **params):
+    """Define (or redefine) a profile's own daily challenge
+
+    ``params`` are the rule's fields: ``count`` and ``seconds`` for
+    ``window``, ``days`` for ``streak`` and ``hour`` for the hour rules.
+    """
+    if rule not in CHALLENGE_RULES:
+        raise ValueError(f"Unknown challenge rule: {rule}")
+    required = {"window": ("count", "seconds"), "streak": ("days",),
+                "before_hour": ("hour",), "after_hour": ("hour",)}.get(rule, ())
+    missing = [field for field in required if field not in params]
+    if missing:
+        raise ValueError(f"Challenge rule {rule} needs {', '.join(missing)}")
+    ch_id = "custom:" + "_".join(name.lower().split())
+    user.setdefault("custom_challenges", {})[ch_id] = dict(
+        {"name": name, "description": description or name, "reward": reward, "rule": rule},
+        **{field: params[field] for field in required})
+    _challenge_states.pop(id(user), None)
+    return ch_id
+
+
+def delete_custom_challenge(user, ch_id):
+    """Remove a profile's own daily challenge and its win record"""
+    if user.get("custom_challenges", {}).pop(ch_id, None) is not None:
+        user.get("challenges_won", {}).pop(ch_id, None)
+        _challenge_states.pop(id(user), None)
+
+
+def bump_history_version(user):
+    """Mark derived history views (Stats frames, caches) as stale"""
+    user["history_version"] = user.get("history_version", 0) + 1
+    bump_revision(user)
+
+
+def bump_revision(user):
+    """Mark anything built from the whole profile (exports, backups) as stale"""
+    user["revision"] = user.get("revision", 0) + 1
+
+
+def _empty_rollups():
+    """Fresh set of materialized counters"""
+    return {"per_day": {}, "exp_per_day": {}, "per_task": {},
+            "per_category": {}, "per_difficulty": {}}
+
+
+def _bump(counter, key, amount):
+    """Add ``amount`` to ``counter[key]``, dropping keys that reach zero"""
+    value = counter.get(key, 0) + amount
+    if value:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+def rebuild_rollups(user):
+    """Recompute every materialized counter from ``completion_history``
+
+    EXP of quests deleted since is no longer known, so their completions only
+    count towards ``per_day``.
+    """
+    rollups = _empty_rollups()
+    index = get_task_index(user)
+    for day, task_ids in user["completion_history"].items():
+        for task_id in task_ids:
+            _count_completion(rollups, day, task_id, index.get(task_id), 1)
+    user["rollups"] = rollups
+    return rollups
+
+
+def get_rollups(user):
+    """Materialized counters, built on first use for older profiles"""
+    if "rollups" not in user:
+        return rebuild_rollups(user)
+    return user["rollups"]
+
+
+def _count_completion(rollups, day, task_id, task, sign):
+    """Apply one completion (``sign`` 1) or undo (``sign`` -1) to the counters"""
+    _bump(rollups["per_day"], day, sign)
+    if task is not None:
+        # JSON object keys are strings, so task ids are too once persisted
+        _bump(rollups["per_task"], str(task_id), sign)
+        _bump(rollups["exp_per_day"], day, sign * get_task_exp(task))
+        _bump(rollups["per_category"], task.get("category") or "other", sign)
+        _bump(rollups["per_difficulty"], task["difficulty"], sign)
+
+
+def _day_times(user, day):
+    """Epoch timestamps parallel to ``completion_history[day]``
+
+    Completions recorded before timestamps existed, or imported without one,
+    are padded in as 0.
+    """
+    times = user.setdefault("completion_times", {}).setdefault(day, [])
+    missing = len(user["completion_history"].get(day, ())) - len(times)
+    if missing > 0:
+        times[:0] = [0] * missing
+    return times
+
+
+def _credit_completion(user, task, now=None):
+    """Add the EXP, rank points and total of one completion of ``task``"""
+    leveled_up = add_experience(user, get_task_exp(task), now)
+    user["rank_points"] += COMPLETION_RANK_POINTS
+    user["total_tasks_completed"] += 1
+    return leveled_up
+
+
+def _record_completion(user, task, day, now=None, timestamp=0):
+    """Apply one completion of ``task`` on ``day`` without checking achievements"""
+    history = user["completion_history"]
+    rollups = get_rollups(user)
+    leveled_up = _credit_completion(user, task, now)
+    _count_completion(rollups, day, task["id"], task, 1)
+    if "current_streak" not in user:
+        recompute_streak(user)
+    times = _day_times(user, day)
+    if not history.get(day):
+        history.setdefault(day, []).append(task["id"])
+        _mark_day_active(user, day)
+    else:
+        history[day].append(task["id"])
+    times.append(timestamp)
+    bump_history_version(user)
+    return leveled_up
+
+
+def mark_task_complete(user, task_id, now=None):
+    """Mark a task as complete for today"""
+    now = now or datetime.now()
+    today = get_today_key(now)
+
+    task = get_task_index(user).get(task_id)
+    if task is not None:
+        journal = _journal(user, today)
+        state = _challenge_state(user, today)
+        timestamp = int(now.timestamp())
+        leveled_up = _record_completion(user, task, today, now, timestamp)
+        if journal is not None:
+            journal.append({"op": "complete", "task": dict(task), "at": timestamp})
+        challenges, challenge_level_up = evaluate_challenges(user, task, now, state)
+        achievements = check_achievements(user, get_completion_streak(user, now), completion_metrics(task))
+        return leveled_up or challenge_level_up, achievements, challenges
+
+    user["completion_history"].setdefault(today, [])
+    return False, [], []
+
+
+def apply_completions(user, events, now=None):
+    """Apply a batch of ``(date_key, task_id)`` completions in one pass
+
+    Streaks are evaluated as of each event's own day so replaying old history
+    in date order awards the same achievements a live session would have.
+    An event may carry its epoch timestamp as a third item, which is stored
+    in ``completion_times``.  Events naming a task that is not in
+    ``daily_tasks`` are counted in ``skipped``.
+    """
+    tasks_by_id = get_task_index(user)
+    result = {"applied": 0, "skipped": 0, "exp_earned": 0,
+              "level_ups": [], "achievements": []}
+
+    for day, task_id, *at in events:
+        task = tasks_by_id.get(task_id)
+        if task is None:
+            result["skipped"] += 1
+            continue
+
+        level_before = user["level"]
+        exp_before = user["total_exp_earned"]
+        journal = _journal(user, day)
+        if journal is not None:
+            # Journaled without its timestamp, so a replay skips the challenges as this batch does
+            journal.append({"op": "complete", "task": dict(task), "at": 0})
+        if _record_completion(user, task, day, now, at[0] if at else 0):
+            result["level_ups"].extend(range(level_before + 1, user["level"] + 1))
+        result["exp_earned"] += user["total_exp_earned"] - exp_before
+        result["applied"] += 1
+
+        streak = user["current_streak"] if user["last_active_day"] == day else 0
+        result["achievements"].extend(check_achievements(user, streak, completion_metrics(task)))
+
+    return result
+
+
+def undo_task_completion(user, task_id, now=None):
+    """Remove today's last completion of a task
+
+    When the completion came after today's checkpoint, the derived fields
+    (EXP, level, rank points, totals, achievements, challenges) are restored
+    from the checkpoint and the rest of today's journal is replayed on top,
+    so they end up as if the completion never happened.  Older completions
+    only come out of the history and the task total.
+    """
+    now = now or datetime.now()
+    today = get_today_key(now)
+    completed = user["completion_history"].get(today, [])
+    if task_id not in completed:
+        return False
+
+    rollups = get_rollups(user)
+    times = _day_times(user, today)
+    i = len(completed) - 1 - completed[::-1].index(task_id)
+    del completed[i]
+    del times[i]
+    _challenge_states.pop(id(user), None)
+    _count_completion(rollups, today, task_id, get_task_index(user).get(task_id), -1)
+    if not completed:
+        _mark_day_inactive(user, today)
+
+    checkpoint = user.get("checkpoint")
+    if checkpoint is not None and checkpoint["day"] == today and i >= checkpoint["count"]:
+        # The n-th completion since the checkpoint is the n-th journaled one
+        n = i - checkpoint["count"]
+        journal = user["journal"]
+        for j, entry in enumerate(journal):
+            if entry["op"] == "complete":
+                if n == 0:
+                    del journal[j]
+                    break
+                n -= 1
+        _replay_journal(user, today, now)
+    else:
+        if checkpoint is not None and checkpoint["day"] == today:
+            checkpoint["count"] -= 1
+        user["total_tasks_completed"] = max(user.get("total_tasks_completed", 0) - 1, 0)
+    bump_history_version(user)
+    return True
+
+
+def _credit_bonus(user, day, now=None):
+    """Add the daily bonus EXP and mark it claimed on ``day``"""
+    add_experience(user, DAILY_BONUS_EXP, now)
+    user["daily_bonus_claimed"] = True
+    user["last_bonus_date"] = day
+
+
+def claim_daily_bonus(user, now=None):
+    """Claim daily bonus"""
+    now = now or datetime.now()
+    today = get_today_key(now)
+
+    if user.get("last_bonus_date") != today:
+        journal = _journal(user, today)
+        _credit_bonus(user, today, now)
+        if journal is not None:
+            journal.append({"op": "bonus", "at": int(now.timestamp())})
+        return True
+    return False
+
+
+# Checkpoints
+
+def _take_checkpoint(user, day):
+    """Start ``day`` with a restore point of the derived fields and an empty journal
+
+    Its counters are also appended to ``checkpoints``, one row per active
+    day, for ``profile_on``.
+    """
+    state = {field: user.get(field) for field in _RESTORE_FIELDS}
+    state["achievements"] = list(user["achievements"])
+    state["challenges_won"] = {ch_id: dict(won) for ch_id, won in user.get("challenges_won", {}).items()}
+    user["checkpoint"] = {"day": day, "count": len(user["completion_history"].get(day, ())),
+                          "state": state}
+    user["journal"] = []
+    row = [day] + [user.get(field, 0) for field in CHECKPOINT_FIELDS] + [len(user["achievements"])]
+    user.setdefault("checkpoints", []).append(row)
+
+
+def _journal(user, day):
+    """Journal of events on ``day``, taking a new checkpoint on a later day
+
+    Returns None for a day before the current checkpoint, whose events can
+    no longer be rolled back exactly.
+    """
+    checkpoint = user.get("checkpoint")
+    if checkpoint is None or day > checkpoint["day"]:
+        _take_checkpoint(user, day)
+    elif day < checkpoint["day"]:
+        return None
+    return user["journal"]
+
+
+def _replay_journal(user, day, now):
+    """Restore today's checkpoint and re-apply today's journal to it
+
+    Costs one step per journaled event.  Achievements and challenges that
+    were deleted since the checkpoint are not restored.
+    """
+    checkpoint = user["checkpoint"]
+    state = checkpoint["state"]
+    for field in _RESTORE_FIELDS:
+        user[field] = state[field]
+    achievements = get_achievements(user)
+    user["achievements"] = [ach_id for ach_id in state["achievements"] if ach_id in achievements]
+    challenges = get_challenges(user)
+    user["challenges_won"] = {ch_id: dict(won) for ch_id, won in state["challenges_won"].items()
+                              if ch_id in challenges}
+
+    challenge_state = _build_challenge_state(user, day, checkpoint["count"])
+    streak = get_completion_streak(user, now)
+    for entry in user["journal"]:
+        at = datetime.fromtimestamp(entry["at"]) if entry["at"] else now
+        if entry["op"] == "bonus":
+            _credit_bonus(user, day, at)
+            continue
+        task = entry["task"]
+        _credit_completion(user, task, at)
+        if entry["at"]:
+            evaluate_challenges(user, task, at, challenge_state)
+        check_achievements(user, streak, completion_metrics(task))
+    user["best_streak"] = max(user["best_streak"], streak)
+    # Awards made outside the journal, such as a custom achievement already met
+    check_achievements(user, streak)
+
+
+def profile_on(user, day, archived_rows=()):
+    """Counters of the profile at the end of ``day``, or None before the first checkpoint
+
+    A checkpoint row holds the counters at the start of its day, so the end
+    of ``day`` is the first row after it (or the live profile after the last
+    one): one bisect, no replay.  Rows moved to the cold archive are not in
+    the profile; for a day before the hot rows the caller passes them, in
+    day order from ``day``'s month on, as ``archived_rows``.
+    """
+    rows = user.get("checkpoints", [])
+    first = user.get("archive", {}).get("first_checkpoint") or (rows[0][0] if rows else None)
+    if first is None or day < first:
+        return None
+    if rows and day >= rows[0][0]:
+        i = bisect.bisect_right(rows, [day, math.inf])
+        row = rows[i] if i < len(rows) else None
+    else:
+        row = next((row for row in chain(archived_rows, rows) if row[0] > day), None)
+    if row is None:
+        values = [user.get(field, 0) for field in CHECKPOINT_FIELDS] + [len(user["achievements"])]
+    else:
+        values = row[1:]
+    return dict(zip(CHECKPOINT_FIELDS + ("achievements",), values))
+
+
+def _task_index_entry(user):
+    """``(user, tasks, id -> task, id -> position)`` for ``user["daily_tasks"]``, rebuilt only when stale"""
+    tasks = user["daily_tasks"]
+    entry = _task_indexes.get(id(user))
+    if entry is None or entry[0] is not user or entry[1] is not tasks or len(entry[2]) != len(tasks):
+        entry = (user, tasks, {task["id"]: task for task in tasks},
+                 {task["id"]: position for position, task in enumerate(tasks)})
+        _task_indexes[id(user)] = entry
+    _task_indexes.move_to_end(id(user))
+    while len(_task_indexes) > TASK_INDEX_CACHE_SIZE:
+        _task_indexes.popitem(last=False)
+    return entry
+
+
+def get_task_index(user):
+    """Id -> task mapping for ``user["daily_tasks"]``, rebuilt only when stale"""
+    return _task_index_entry(user)[2]
+
+
+def _first_unused_task_id(user):
+    """Smallest id above every id still referenced by quests or history"""
+    used = [t["id"] for t in user["daily_tasks"]]
+    used.extend(task_id for task_ids in user["completion_history"].values() for task_id in task_ids)
+    used.append(user.get("archive", {}).get("max_task_id", 0))
+    return max(used, default=0) + 1
+
+
+def _allocate_task_id(user):
+    """Hand out the next quest id; ids are never reused, even after deletes"""
+    if "next_task_id" not in user:
+        user["next_task_id"] = _first_unused_task_id(user)
+    new_id = user["next_task_id"]
+    user["next_task_id"] += 1
+    return new_id
+
+
+def add_task(user, name, difficulty, exp, category):
+    """Add a new quest and return it"""
+    new_id = _allocate_task_id(user)
+    task = {
+        "id": new_id,
+        "name": name,
+        "difficulty": difficulty,
+        "exp": exp,
+        "category": category
+    }
+    _, tasks, index, positions = _task_index_entry(user)
+    positions[new_id] = len(tasks)
+    tasks.append(task)
+    index[new_id] = task
+    bump_history_version(user)
+    return task
+
+
+def delete_task(user, task_id):
+    """Delete a quest; the last quest takes over its place in the list"""
+    _, tasks, index, positions = _task_index_entry(user)
+    task = index.pop(task_id, None)
+    if task is not None:
+        position = positions.pop(task_id)
+        last = tasks.pop()
+        if last is not task:
+            tasks[position] = last
+            positions[last["id"]] = position
+        # Completions of deleted quests stay in the per-day counts but no
+        # longer belong to any quest, category or difficulty
+        rollups = get_rollups(user)
+        count = rollups["per_task"].pop(str(task_id), 0)
+        _bump(rollups["per_category"], task.get("category") or "other", -count)
+        _bump(rollups["per_difficulty"], task["difficulty"], -count)
+        bump_history_version(user)
+
+
+def archive_history(user, before):
+    """Move every day older than ``before`` out of the history and checkpoint rows
+
+    Returns the removed days for the caller to store, as ``{"completion_history":
+    {day: [task ids]}, "completion_times": {day: [timestamps]}, "checkpoints":
+    {day: counters}}``, and folds them into
+    the ``user["archive"]`` summary: archived months, the streak run ending on
+    the last archived active day, the highest id seen so quest ids are never
+    reused, and the first checkpoint day so ``profile_on`` knows how far back
+    the archived rows reach.
+    """
+    history = user["completion_history"]
+    cold_days = sorted(day for day in history if day < before)
+    rows = user.get("checkpoints", [])
+    split = bisect.bisect_left(rows, [before])
+    if not cold_days and not split:
+        return {}
+
+    archive = user.setdefault("archive", {"before": before, "months": [], "run": 0,
+                                          "last_active_day": None, "max_task_id": 0})
+    previous = _day_ordinal(archive["last_active_day"]) if archive["last_active_day"] else None
+    run = archive["run"]
+    months = set(archive["months"])
+    times = user.get("completion_times", {})
+    cold = {}
+    cold_times = {}
+    for day in cold_days:
+        if day in times:
+            cold_times[day] = times.pop(day)
+        task_ids = cold[day] = history.pop(day)
+        months.add(day[:7])
+        if not task_ids:
+            continue
+        archive["max_task_id"] = max(archive["max_task_id"], max(task_ids))
+        ordinal = _day_ordinal(day)
+        if previous is None or ordinal > previous:
+            run = run + 1 if previous == ordinal - 1 else 1
+            previous = ordinal
+
+    if split:
+        archive.setdefault("first_checkpoint", rows[0][0])
+        for row in rows[:split]:
+            months.add(row[0][:7])
+        user["checkpoints"] = rows[split:]
+
+    archive["before"] = max(archive["before"], before)
+    archive["months"] = sorted(months)
+    archive["run"] = run
+    archive["last_active_day"] = _day_key(previous) if previous is not None else None
+    bump_history_version(user)
+    return {"completion_history": cold, "completion_times": cold_times,
+            "checkpoints": {row[0]: row[1:] for row in rows[:split]}}
+
+
+def _close_season(user, now=None):
+    """Keep a summary of the season that is ending in ``season_history``"""
+    user.setdefault("season_history", []).append({
+        "season": user["current_season"],
+        "ended": get_today_key(now),
+        "level": user["level"],
+        "rank": user["rank"],
+        "rank_points": user["rank_points"],
+        "season_exp": user.get("season_exp", 0),
+    })
+
+
+def advance_season(user, season, now=None):
+    """Move to ``season`` by the calendar: archive the finished one and reset its counters
+
+    Unlike ``start_new_season`` the history, streaks and lifetime totals are
+    kept.  A checkpoint taken earlier today would restore the old season's
+    counters, so it is dropped and today's completions so far become
+    permanent.
+    """
+    _close_season(user, now)
+    user["current_season"] = season
+    user["level"] = 1
+    user["experience"] = 0
+    user["exp_needed"] = get_exp_needed_for_level(1)
+    user["rank_points"] = 0
+    user["rank"] = RANK_SYSTEM[0]["rank"]
+    user["season_exp"] = 0
+    checkpoint = user.get("checkpoint")
+    if checkpoint is not None and checkpoint["day"] == get_today_key(now):
+        user["checkpoint"] = None
+        user["journal"] = []
+
+
+def roll_over_day(user, now=None):
+    """Day-boundary upkeep: daily flags, the calendar season and today's checkpoint
+
+    Done once per day; later calls return False straight away, so callers
+    on the request path only pay for it when the scheduler has not run yet.
+    """
+    now = now or datetime.now()
+    today = get_today_key(now)
+    last = user.get("last_rollover")
+    if last == today:
+        return False
+    bump_revision(user)
+    user["last_rollover"] = today
+    if user.get("last_bonus_date") != today:
+        user["daily_bonus_claimed"] = False
+    season = season_for(now)
+    if last is None:
+        # Profiles from before the calendar seasons join the current one as they are
+        user["current_season"] = season
+    elif user["current_season"] != season:
+        advance_season(user, season, now)
+    # Close yesterday's journal now rather than on today's first completion
+    _journal(user, today)
+    _challenge_states.pop(id(user), None)
+    return True
+
+
+def start_new_season(user, season, now=None):
+    """Switch season, resetting level, EXP, rank points and history"""
+    _close_season(user, now)
+    user["current_season"] = season
+    user["level"] = 1
+    user["experience"] = 0
+    user["rank_points"] = 0
+    user["season_exp"] = 0
+    user["completion_history"] = {}
+    user["completion_times"] = {}
+    user.pop("archive", None)
+    user["checkpoint"] = None
+    user["journal"] = []
+    user["checkpoints"] = []
+    user["rollups"] = _empty_rollups()
+    bump_history_version(user)
+    user["current_streak"] = 0
+    user["last_active_day"] = None
+
+
+# Schema migrations
+
+def _migrate_v1(user):
+    """v1 -> v2: fill keys that older saves (and the old reset path) dropped"""
+    if "next_task_id" not in user:
+        user["next_task_id"] = _first_unused_task_id(user)
+    if "rollups" not in user:
+        rebuild_rollups(user)
+    if "current_streak" not in user or "last_active_day" not in user:
+        recompute_streak(user)
+    for key, value in new_user_data().items():
+        user.setdefault(key, value)
+
+
+def _migrate_v2(user):
+    """v2 -> v3: start ``season_exp`` from the EXP of this season's completions
+
+    Bonus EXP claimed before the upgrade is not in the counters, so it is
+    left out.
+    """
+    user["season_exp"] = sum(get_rollups(user)["exp_per_day"].values())
+
+
+def _migrate_v3(user):
+    """v3 -> v4: checkpoint rows are packed and archived like the history
+
+    Nothing changes in the dict itself; profiles saved before checkpoints
+    existed just get an empty list.
+    """
+    user.setdefault("checkpoints", [])
+
+
+# Step that upgrades a profile from each version to the next
+MIGRATIONS = {1: _migrate_v1, 2: _migrate_v2, 3: _migrate_v3}
+
+
+def migrate_profile(user):
+    """Upgrade a loaded profile to ``SCHEMA_VERSION`` in place and return it
+
+    Profiles saved before versioning was introduced count as version 1.
+    """
+    version = user.get("schema_version", 1)
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Profile schema {version} is newer than this app ({SCHEMA_VERSION})")
+    while version < SCHEMA_VERSION:
+        MIGRATIONS[version](user)
+        version += 1
+        user["schema_version"] = version
+    return user
+
+
+def make_event(op, now=None, **fields):
+    """Build a mutation record that ``apply_event`` can replay"""
+    event = {"op": op, "at": (now or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")}
+    event.update(fields)
+    return event
+
+
+def apply_event(user, event):
+    """Apply one mutation record produced by ``make_event`` and return its result"""
+    op = event["op"]
+    now = datetime.strptime(event["at"], "%Y-%m-%d %H:%M:%S")
+    bump_revision(user)
+
+    if op == "complete":
+        return mark_task_complete(user, event["task_id"], now)
+    if op == "undo":
+        return undo_task_completion(user, event["task_id"], now)
+    if op == "add_task":
+        return add_task(user, event["name"], event["difficulty"], event["exp"], event["category"])
+    if op == "delete_task":
+        return delete_task(user, event["task_id"])
+    if op == "bonus":
+        return claim_daily_bonus(user, now)
+    if op == "season":
+        return start_new_season(user, event["season"], now)
+    if op == "rollover":
+        return roll_over_day(user, now)
+    if op == "add_achievement":
+        return add_custom_achievement(user, event["name"], event["metric"], event["threshold"],
+                                      event.get("emoji", "🎯"), event.get("description"))
+    if op == "delete_achievement":
+        return delete_custom_achievement(user, event["ach_id"])
+    if op == "add_challenge":
+        return add_custom_challenge(user, event["name"], event["rule"], event["reward"],
+                                    event.get("description"), **event.get("params", {}))
+    if op == "delete_challenge":
+        return delete_custom_challenge(user, event["ch_id"])
+    raise ValueError(f"Unknown event op: {op}")
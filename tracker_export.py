@@ -0,0 +1,257 @@
+"""Streaming export and import of Daily Tracker profiles.
+
+Exports are generators of ``bytes`` chunks, so nothing is encoded until a
+download is asked for and a long history never sits in memory as one big
+string:
+
+* ``completions_ndjson``: one JSON object per completion
+* ``completions_csv``: the same fields as CSV rows
+* ``backup``: the whole profile, archived history folded back in, as JSON
+  compressed with gzip or lzma while it is encoded
+
+Imports read a file object a line (or a compressed block) at a time.
+Completion files are checked row by row and merged into a profile with one
+``apply_completions`` batch; backups are checked as a whole before they
+replace a profile.
+"""
+import csv
+import gzip
+import io
+import json
+import lzma
+import zlib
+from collections import Counter
+from datetime import datetime
+from itertools import chain
+
+import tracker_engine as engine
+import tracker_storage as storage
+import tracker_trace as trace
+
+# Bytes collected before a chunk is handed on
+CHUNK_SIZE = 64 * 1024
+CSV_FIELDS = ("day", "task_id", "task", "category", "difficulty", "at")
+# Format -> (file name suffix, MIME type)
+EXPORT_FORMATS = {
+    "ndjson": ("completions.ndjson", "application/x-ndjson"),
+    "csv": ("completions.csv", "text/csv"),
+    "gzip": ("backup.json.gz", "application/gzip"),
+    "lzma": ("backup.json.xz", "application/x-xz"),
+}
+GZIP_MAGIC = b"\x1f\x8b"
+LZMA_MAGIC = b"\xfd7zXZ\x00"
+# Top-level profile keys a backup must have, with their types
+REQUIRED_KEYS = {
+    "level": int,
+    "experience": int,
+    "exp_needed": int,
+    "rank_points": int,
+    "daily_tasks": list,
+    "completion_history": dict,
+    "achievements": list,
+}
+
+
+def _completion_rows(user, filename):
+    """One dict per completion in date order, archived days included"""
+    tasks_by_id = engine.get_task_index(user)
+    for day, task_ids, stamps in storage.history_days(user, filename):
+        for task_id, at in zip(task_ids, stamps):
+            task = tasks_by_id.get(task_id, {})
+            yield {"day": day, "task_id": task_id, "task": task.get("name"),
+                   "category": task.get("category"), "difficulty": task.get("difficulty"),
+                   "at": at}
+
+
+def completions_ndjson(user, filename=storage.DEFAULT_FILE):
+    """Completions as NDJSON, in chunks of about ``CHUNK_SIZE`` bytes"""
+    lines = []
+    size = 0
+    for row in _completion_rows(user, filename):
+        line = json.dumps(row, separators=(",", ":"), ensure_ascii=False) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(lines).encode("utf-8")
+            lines = []
+            size = 0
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+def completions_csv(user, filename=storage.DEFAULT_FILE):
+    """Completions as CSV with a header row, in chunks of about ``CHUNK_SIZE`` bytes"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, CSV_FIELDS)
+    writer.writeheader()
+    for row in _completion_rows(user, filename):
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def backup(user, filename=storage.DEFAULT_FILE, codec="gzip"):
+    """The whole profile as compressed JSON, encoded and compressed a piece at a time
+
+    Archived days are folded back into ``completion_history``, along with
+    their timestamps and checkpoint rows, and the archive summary is left
+    out, so a restored profile archives them again on its first save.
+    """
+    if codec == "gzip":
+        compressor = zlib.compressobj(wbits=31)
+    elif codec == "lzma":
+        compressor = lzma.LZMACompressor()
+    else:
+        raise ValueError(f"Unknown backup codec: {codec}")
+    profile = {key: value for key, value in user.items() if key != "archive"}
+    days = list(storage.history_days(user, filename))
+    profile["completion_history"] = {day: task_ids for day, task_ids, _ in days}
+    profile["completion_times"] = {day: stamps for day, _, stamps in days}
+    profile["checkpoints"] = list(storage.checkpoint_rows(user, filename))
+
+    pending = []
+    size = 0
+    for piece in json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).iterencode(profile):
+        pending.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            out = compressor.compress("".join(pending).encode("utf-8"))
+            pending = []
+            size = 0
+            if out:
+                yield out
+    yield compressor.compress("".join(pending).encode("utf-8")) + compressor.flush()
+
+
+def export(user, fmt, filename=storage.DEFAULT_FILE):
+    """Generator of the ``fmt`` export of a profile (see ``EXPORT_FORMATS``)"""
+    if fmt == "ndjson":
+        return completions_ndjson(user, filename)
+    if fmt == "csv":
+        return completions_csv(user, filename)
+    if fmt in ("gzip", "lzma"):
+        return backup(user, filename, fmt)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def open_upload(fileobj):
+    """Binary stream of an uploaded file, decompressing gzip and lzma as it is read"""
+    head = fileobj.read(len(LZMA_MAGIC))
+    fileobj.seek(0)
+    if head.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=fileobj)
+    if head.startswith(LZMA_MAGIC):
+        return lzma.LZMAFile(fileobj)
+    return fileobj
+
+
+def _parse_completion(row, where, today):
+    """``(day, task_id, at)`` of one imported row, or ValueError naming ``where``
+
+    Days after ``today`` are rejected like malformed rows: they would move
+    the streak and today's undo checkpoint into the future.
+    """
+    try:
+        day = str(row["day"])
+        datetime.strptime(day, engine.DATE_FORMAT)
+        completion = day, int(row["task_id"]), int(row.get("at") or 0)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"{where}: not a completion ({e})") from None
+    if day > today:
+        raise ValueError(f"{where}: {day} is in the future")
+    return completion
+
+
+def read_completions(fileobj, now=None):
+    """``(day, task_id, at)`` of an NDJSON or CSV completions file, checked as they are read"""
+    today = engine.get_today_key(now)
+    text = io.TextIOWrapper(open_upload(fileobj), encoding="utf-8", newline="")
+    first = text.readline()
+    if first.lstrip().startswith("{"):
+        for number, line in enumerate(chain([first], text), 1):
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    raise ValueError(f"line {number}: invalid JSON") from None
+                yield _parse_completion(row, f"line {number}", today)
+        return
+    reader = csv.DictReader(text, fieldnames=next(csv.reader([first]), None))
+    if not reader.fieldnames or not {"day", "task_id"} <= set(reader.fieldnames):
+        raise ValueError("CSV needs day and task_id columns")
+    for number, row in enumerate(reader, 2):
+        yield _parse_completion(row, f"row {number}", today)
+
+
+@trace.traced("import_completions")
+def merge_completions(user, events):
+    """Apply the imported completions a profile does not have yet in one batch
+
+    Per day and quest only the completions beyond those already recorded
+    are new, so importing the same file twice changes nothing; the new ones
+    keep their latest timestamps and are applied in time order.  Days that
+    were moved to the cold archive are not merged.  Returns the
+    ``apply_completions`` result plus ``duplicates`` and ``archived`` counts.
+    """
+    history = user["completion_history"]
+    archived_before = user.get("archive", {}).get("before")
+    imported = {}
+    for day, task_id, at in events:
+        imported.setdefault((day, task_id), []).append(at)
+    seen = {}
+    batch = []
+    duplicates = archived = 0
+    for (day, task_id), stamps in sorted(imported.items()):
+        count = len(stamps)
+        if archived_before is not None and day < archived_before:
+            archived += count
+            continue
+        if day not in seen:
+            seen[day] = Counter(history.get(day, ()))
+        new = max(count - seen[day][task_id], 0)
+        duplicates += count - new
+        batch.extend((day, task_id, at) for at in sorted(stamps)[count - new:])
+    batch.sort(key=lambda event: (event[0], event[2]))
+    result = engine.apply_completions(user, batch)
+    result["duplicates"] = duplicates
+    result["archived"] = archived
+    return result
+
+
+def validate_profile(data):
+    """Raise ValueError unless ``data`` has the shape of a saved profile"""
+    if not isinstance(data, dict):
+        raise ValueError("backup is not a JSON object")
+    for key, kind in REQUIRED_KEYS.items():
+        if not isinstance(data.get(key), kind):
+            raise ValueError(f"{key} is missing or not a {kind.__name__}")
+    for task in data["daily_tasks"]:
+        if not isinstance(task, dict) or not {"id", "name", "difficulty", "exp"} <= task.keys():
+            raise ValueError(f"invalid quest: {task!r}")
+        if task["difficulty"] not in engine.DIFFICULTY_EXP:
+            raise ValueError(f"unknown difficulty: {task['difficulty']}")
+    for day, task_ids in data["completion_history"].items():
+        try:
+            datetime.strptime(day, engine.DATE_FORMAT)
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid day in history: {day!r}") from None
+        if not isinstance(task_ids, list) or not all(isinstance(t, int) for t in task_ids):
+            raise ValueError(f"invalid completions on {day}")
+
+
+@trace.traced("import_backup")
+def read_backup(fileobj):
+    """Profile restored from a JSON backup (plain, gzip or lzma), checked and migrated"""
+    try:
+        data = json.load(io.TextIOWrapper(open_upload(fileobj), encoding="utf-8"))
+    except (ValueError, EOFError, OSError, lzma.LZMAError) as e:
+        raise ValueError(f"not a readable backup ({e})") from None
+    validate_profile(data)
+    engine.migrate_profile(data)
+    engine.recompute_streak(data)
+    engine.rebuild_rollups(data)
+    return data
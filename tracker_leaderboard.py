@@ -0,0 +1,102 @@
+"""Cross-user leaderboard index for the Daily Tracker.
+
+The index keeps, for every metric, the players sorted best first as
+``[-score, name]`` pairs, next to each player's current scores::
+
+    {"version": 1,
+     "scores": {name: {metric: score, ...}},
+     "order": {metric: [[-score, name], ...]}}
+
+Top K is a slice and a player's position is one ``bisect``, so the page never
+touches the profiles themselves.  Updating a player moves one entry per
+metric.  ``tracker_storage`` keeps the persisted copy current on every save;
+``python tracker_leaderboard.py --rebuild`` recomputes it from all saved
+profiles for recovery.
+"""
+import argparse
+import bisect
+
+METRICS = {
+    "level": "⭐ Level",
+    "rank_points": "🏆 Rank Points",
+    "best_streak": "🔥 Best Streak",
+    "season_exp": "⚔️ Season EXP",
+}
+INDEX_VERSION = 1
+
+
+def new_index():
+    """Empty leaderboard index"""
+    return {"version": INDEX_VERSION, "scores": {}, "order": {metric: [] for metric in METRICS}}
+
+
+def scores_of(user):
+    """Leaderboard scores of a profile"""
+    return {metric: user.get(metric, 0) for metric in METRICS}
+
+
+def _remove(order, score, name):
+    """Drop ``name``'s entry from one metric's order"""
+    i = bisect.bisect_left(order, [-score, name])
+    if i < len(order) and order[i][1] == name:
+        del order[i]
+
+
+def update(index, name, scores):
+    """Set ``name``'s scores; returns False if nothing changed"""
+    old = index["scores"].get(name)
+    if old == scores:
+        return False
+    for metric in METRICS:
+        order = index["order"][metric]
+        if old is not None:
+            _remove(order, old[metric], name)
+        bisect.insort(order, [-scores[metric], name])
+    index["scores"][name] = scores
+    return True
+
+
+def remove(index, name):
+    """Take ``name`` off the leaderboard; returns False if it was not on it"""
+    old = index["scores"].pop(name, None)
+    if old is None:
+        return False
+    for metric in METRICS:
+        _remove(index["order"][metric], old[metric], name)
+    return True
+
+
+def top(index, metric, k=10):
+    """``(name, score)`` of the best ``k`` players by ``metric``"""
+    return [(name, -negated) for negated, name in index["order"][metric][:k]]
+
+
+def position(index, metric, name):
+    """1-based place of ``name`` by ``metric``, or None if not listed"""
+    scores = index["scores"].get(name)
+    if scores is None:
+        return None
+    return bisect.bisect_left(index["order"][metric], [-scores[metric], name]) + 1
+
+
+def size(index):
+    """Number of players on the leaderboard"""
+    return len(index["scores"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily Tracker leaderboard index")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="recompute the index from every saved profile")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    import tracker_storage as storage
+    index = storage.rebuild_leaderboard()
+    print(f"Indexed {size(index)} profiles")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""In-process scheduler for the Daily Tracker's day and season boundaries.
+
+A daemon thread sleeps until local midnight and then rolls every profile
+this process holds in memory over to the new day (``engine.roll_over_day``):
+it resets the daily flags, advances the season when the calendar enters a
+new one (archiving the finished season's summary), takes the day's undo
+checkpoint and moves history that left the hot window to the cold archive.
+Each rollover is recorded as a ``rollover`` event, so the log backend
+replays it like any other mutation.
+
+The first rerun after midnight then finds its profile already rolled over.
+Profiles loaded later roll over on their first use through the same
+idempotent call.  ``TRACKER_SCHEDULER=0`` turns the thread off.
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+
+import tracker_engine as engine
+import tracker_storage as storage
+import tracker_trace as trace
+
+SCHEDULER = os.environ.get("TRACKER_SCHEDULER", "1") != "0"
+# Seconds past midnight to wake, so the new day's key is in effect
+WAKE_DELAY = 1.0
+
+_thread = None
+_stop = threading.Event()
+_status = {"next_run": None, "last_run": None, "rolled_over": 0}
+
+
+def next_midnight(now=None):
+    """Start of the day after ``now``"""
+    now = now or datetime.now()
+    return datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+
+
+def roll_over(user, filename, now=None):
+    """Roll one profile over to ``now``'s day and persist it; False if already done"""
+    event = engine.make_event("rollover", now=now)
+    with storage.profile_lock(filename):
+        if not engine.apply_event(user, event):
+            return False
+        storage.archive_cold_history(user, filename, now)
+        storage.record_change(user, event, filename)
+    return True
+
+
+def run_rollover(profiles, now=None):
+    """Roll every ``(file name, profile)`` over; returns how many changed"""
+    now = now or datetime.now()
+    count = 0
+    with trace.background("rollover"):
+        for filename, user in profiles:
+            try:
+                count += roll_over(user, filename, now)
+            except Exception:
+                # One broken profile must not stop the others
+                continue
+    _status["last_run"] = now.strftime("%Y-%m-%d %H:%M:%S")
+    _status["rolled_over"] = count
+    return count
+
+
+def _worker(profiles):
+    """Sleep until each midnight and roll the profiles ``profiles()`` returns over"""
+    while not _stop.is_set():
+        wake = next_midnight() + timedelta(seconds=WAKE_DELAY)
+        _status["next_run"] = wake.strftime("%Y-%m-%d %H:%M:%S")
+        if _stop.wait((wake - datetime.now()).total_seconds()):
+            return
+        run_rollover(profiles())
+
+
+def start(profiles):
+    """Start the scheduler thread once per process
+
+    ``profiles`` is called at each midnight for the ``(file name, profile)``
+    pairs to roll over, e.g. ``ProfileCache.items``.
+    """
+    global _thread
+    if SCHEDULER and (_thread is None or not _thread.is_alive()):
+        _stop.clear()
+        _thread = threading.Thread(target=_worker, args=(profiles,), name="tracker-scheduler",
+                                   daemon=True)
+        _thread.start()
+    return _thread
+
+
+def stop():
+    """Stop the scheduler thread"""
+    _stop.set()
+
+
+def status():
+    """When the scheduler runs next, when it last ran and how many profiles that rolled over"""
+    return dict(_status, running=_thread is not None and _thread.is_alive())
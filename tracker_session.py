@@ -0,0 +1,262 @@
+"""Streamlit session glue shared by the entry script and the page views."""
+import os
+import weakref
+from datetime import datetime
+from functools import lru_cache
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import tracker_engine as engine
+import tracker_scheduler as scheduler
+import tracker_storage as storage
+import tracker_trace as trace
+from tracker_engine import SEASONS, get_current_rank, get_today_key, new_user_data
+
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "style.css")
+# Show the performance panel in the sidebar (also with ``?dev=1`` in the URL)
+DEV_PANEL = os.environ.get("TRACKER_DEV", "0") == "1"
+
+# Motivational quotes
+MOTIVATIONAL_QUOTES = [
+    "🌟 Every small step counts! Keep going!",
+    "💪 You're building a better version of yourself!",
+    "🚀 Success is the sum of small efforts repeated day after day!",
+    "⭐ Your consistency is your superpower!",
+    "🔥 Don't break the chain! Keep that streak alive!",
+    "🎯 Progress, not perfection!",
+    "💎 You're becoming unstoppable!",
+    "🏆 Your future self will thank you!",
+    "✨ Every task completed is a victory!",
+    "🌱 Small daily habits create big life changes!",
+    "👑 You are the hero of your own story!",
+    "⚡ Discipline is choosing what you want most over what you want now!",
+    "🎪 Fun fact: Winners never quit, quitters never win!",
+    "🌈 Today's effort = Tomorrow's success!",
+    "🎭 Your mind is your greatest superpower!",
+]
+
+TIER_EMOJIS = {
+    1: "🐤", 2: "🦅", 3: "🦁", 4: "🐉", 5: "👑",
+    10: "⭐", 20: "💫", 30: "✨", 50: "🌟", 100: "🏆"
+}
+
+
+@lru_cache(maxsize=1)
+def load_css():
+    """Read the stylesheet once per process"""
+    with open(CSS_PATH, 'r') as f:
+        return f"<style>\n{f.read()}</style>"
+
+
+# Data storage utilities
+@st.cache_resource
+def profile_cache():
+    """Parsed profiles shared by every session of this server process"""
+    return storage.ProfileCache()
+
+
+@st.cache_resource
+def start_scheduler():
+    """Midnight rollover of every cached profile, started once per server process"""
+    return scheduler.start(profile_cache().items)
+
+
+def current_profile():
+    """Shard file name of this session's user"""
+    return st.session_state.get("profile_file", storage.DEFAULT_FILE)
+
+
+def save_user_data(filename=None):
+    """Save user data to JSON file now, bypassing the autosave window"""
+    return storage.save_user_data(st.session_state.user_data, filename or current_profile())
+
+
+def load_user_data(filename=None):
+    """Load user data from JSON file"""
+    return storage.load_user_data(filename or current_profile())
+
+
+def set_profile(user):
+    """Replace this user's profile (after a load, reset or upload) in every session"""
+    st.session_state.user_data = user
+    profile_cache().put(current_profile(), user)
+
+
+def commit_event(op, **fields):
+    """Apply a mutation to the profile and persist it"""
+    event = engine.make_event(op, **fields)
+    filename = current_profile()
+    with storage.profile_lock(filename):
+        result = engine.apply_event(st.session_state.user_data, event)
+        storage.record_change(st.session_state.user_data, event, filename)
+    return result
+
+
+def switch_profile(username):
+    """Attach this session to ``username``'s profile from the next run on"""
+    storage.flush_pending(current_profile())
+    st.session_state.username = username
+    st.session_state.profile_file = storage.profile_filename(username)
+    st.session_state.pop("user_data", None)
+    if username:
+        st.query_params["user"] = username
+    else:
+        st.query_params.pop("user", None)
+
+
+@trace.traced("init_session")
+def init_session():
+    """Attach the session to its user's shared profile on every full run
+
+    The user comes from ``?user=`` on a session's first run.  Fetching the
+    profile from the shared cache each run is a stat call, and picks up
+    loads and resets done in the user's other sessions.
+    """
+    first_run = "profile_file" not in st.session_state
+    if first_run:
+        st.session_state.username = st.query_params.get("user", "")
+        st.session_state.profile_file = storage.profile_filename(st.session_state.username)
+        ctx = get_script_run_ctx()
+        if ctx:
+            # Write out pending autosaves when the session is torn down
+            weakref.finalize(ctx.session_state, storage.flush_pending)
+
+    filename = current_profile()
+    user = profile_cache().get(filename)
+    saved = user is not None
+    if not saved:
+        # Nothing saved for this user yet; keep (and share) the session's profile
+        user = st.session_state.get("user_data") or new_user_data()
+        profile_cache().put(filename, user)
+    st.session_state.user_data = user
+    start_scheduler()
+    # Usually done by the scheduler already; otherwise once, on this run
+    if user.get("last_rollover") != get_today_key():
+        if saved:
+            scheduler.roll_over(user, filename)
+        else:
+            engine.roll_over_day(user)
+
+
+def get_today_completed():
+    """Get completed tasks for today"""
+    today = get_today_key()
+    return st.session_state.user_data["completion_history"].get(today, [])
+
+
+@trace.traced("get_completion_streak")
+def get_completion_streak():
+    """Calculate current completion streak"""
+    return engine.get_completion_streak(st.session_state.user_data)
+
+
+def claim_daily_bonus():
+    """Claim daily bonus"""
+    return commit_event("bonus")
+
+
+def in_fragment_rerun():
+    """True while only a fragment, not the whole app, is rerunning"""
+    ctx = get_script_run_ctx()
+    return bool(ctx and ctx.fragment_ids_this_run)
+
+
+@trace.traced("header")
+def render_header(slot=None):
+    """Draw the level / rank / season cards
+
+    The full run claims ``slot`` (an ``st.empty``) and remembers it, so the
+    sidebar and quest row fragments can redraw just the header when they rerun.
+    """
+    if slot is None:
+        slot = st.session_state.header_slot
+    else:
+        st.session_state.header_slot = slot
+    user = st.session_state.user_data
+
+    with slot.container():
+        col1, col2, col3 = st.columns([2, 2, 1])
+
+        with col1:
+            rank_info = get_current_rank(user['rank_points'])
+            st.markdown(f"""
+            <div class='level-container'>
+                <h2>⚔️ LEVEL {user['level']}</h2>
+                <p>Experience: {user['experience']}/{user['exp_needed']}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+            progress = user['experience'] / user['exp_needed']
+            st.progress(min(progress, 1.0))
+
+        with col2:
+            st.markdown(f"""
+            <div class='rank-container'>
+                <h2>{rank_info['emoji']} {rank_info['rank']}</h2>
+                <p>Rank Points: {user['rank_points']}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+        with col3:
+            season = SEASONS[user['current_season']]
+            st.markdown(f"""
+            <div class='season-container'>
+                <h4>Season {user['current_season']}</h4>
+                <p style='margin: 5px 0;'>{season['name']}</p>
+                <small>{season['start_date']} - {season['end_date']}</small>
+            </div>
+            """, unsafe_allow_html=True)
+
+
+@st.fragment
+@trace.traced("fragment:sidebar", root=trace.rerun)
+def render_sidebar():
+    """Save/load buttons and the daily bonus; call inside ``with st.sidebar``"""
+    st.title("⚔️ Daily Tracker")
+
+    col_save1, col_save2 = st.columns(2)
+    with col_save1:
+        if st.button("💾 Save", key="save_btn", use_container_width=True):
+            success, _ = save_user_data()
+            if success:
+                st.session_state.user_data["last_saved"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                engine.bump_revision(st.session_state.user_data)
+                st.success("✅ Saved!")
+
+    with col_save2:
+        if st.button("📥 Load", key="load_btn", use_container_width=True):
+            loaded = load_user_data()
+            if loaded:
+                set_profile(loaded)
+                st.success("✅ Loaded!")
+                st.rerun()
+
+    st.divider()
+
+    # Daily bonus
+    today = get_today_key()
+    if st.session_state.user_data.get("last_bonus_date") != today:
+        st.button("🎁 Claim Daily Bonus (+25 EXP)", use_container_width=True, on_click=claim_daily_bonus)
+    else:
+        st.caption("✅ Daily bonus claimed today!")
+
+    if in_fragment_rerun():
+        render_header()
+
+
+def render_dev_panel():
+    """Span trees of recent reruns and the trace counters; hidden unless enabled"""
+    if not (DEV_PANEL or st.query_params.get("dev") == "1"):
+        return
+    with st.expander("🛠️ Performance"):
+        reruns = trace.recent_reruns()
+        if not reruns:
+            st.caption("No reruns traced yet")
+        count = st.number_input("Reruns", min_value=1, max_value=trace.TRACE_RERUNS, value=5,
+                                key="dev_panel_reruns")
+        for node in reruns[:count]:
+            st.caption(node["at"])
+            st.code("\n".join(trace.format_tree(node)), language=None)
+        st.download_button("📥 Counters", trace.prometheus_text(), file_name="tracker_metrics.txt",
+                           mime="text/plain")
@@ -0,0 +1,291 @@
+"""Compact, versioned snapshot format for Daily Tracker profiles.
+
+A packed snapshot is a small header followed by an optionally compressed body::
+
+    b"DTRK" | schema version (u8) | codec (u8) | body
+
+The body holds the profile without its day-keyed fields as compact JSON,
+preceded by a small JSON layout of the columns that follow.  Each field of
+``DAY_LISTS`` (the completion history, its timestamps and the checkpoint
+rows) is three arrays: the ``int32`` day ordinal of every day, the number of
+values on that day, and all values in day order.  The date-keyed rollup counters follow as
+ordinal/value pairs.  Dates therefore cost four bytes instead of a twelve
+byte string key, and loading the history is a few ``array.frombytes`` calls
+instead of parsing one JSON list per day.
+
+``pack_segment`` writes just the ``DAY_LISTS`` columns of some days under the
+same header; the cold archive of ``tracker_storage`` stores one such segment
+per month.
+
+``loads`` also accepts the plain JSON files written by earlier versions and
+runs every loaded profile through ``engine.migrate_profile``.
+"""
+import json
+import lzma
+import struct
+import sys
+import zlib
+from array import array
+from datetime import date
+
+import tracker_engine as engine
+
+MAGIC = b"DTRK"
+CODECS = {"none": 0, "zlib": 1, "lzma": 2}
+_CODEC_NAMES = {v: k for k, v in CODECS.items()}
+
+_HEADER = struct.Struct("<4sBB")
+# Day-keyed list fields stored as columns, and the array typecode of their values
+DAY_LISTS = {"completion_history": "i", "completion_times": "q", "checkpoints": "i"}
+# Date-keyed rollup counters stored as ordinal/value columns
+DAY_ROLLUPS = ("per_day", "exp_per_day")
+# First schema version whose snapshots and segments carry a column layout
+LAYOUT_VERSION = 4
+
+# Layout JSON length, then profile JSON length
+_SIZES = struct.Struct("<II")
+# Before LAYOUT_VERSION: JSON length, visited days, completions, day rollup lengths
+_V3_SIZES = struct.Struct("<III" + "I" * len(DAY_ROLLUPS))
+
+
+def _int_array(values, typecode="i"):
+    """Little-endian array of ``values`` (int32 unless ``typecode`` says otherwise)"""
+    packed = array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed
+
+
+def _read_ints(body, offset, count, typecode="i"):
+    """``count`` little-endian integers of ``typecode`` from ``body`` at ``offset``"""
+    values = array(typecode)
+    end = offset + values.itemsize * count
+    values.frombytes(body[offset:end])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values, end
+
+
+def _compress(body, codec):
+    """Compress a snapshot body with ``codec``"""
+    if codec == "zlib":
+        return zlib.compress(body, 1)
+    if codec == "lzma":
+        return lzma.compress(body)
+    return body
+
+
+def _decompress(body, codec):
+    """Undo ``_compress``"""
+    if codec == "zlib":
+        return zlib.decompress(body)
+    if codec == "lzma":
+        return lzma.decompress(body)
+    return body
+
+
+def _day_keys(ordinals, keys):
+    """Date keys of ``ordinals``, memoized in ``keys`` across columns"""
+    out = []
+    for ordinal in ordinals:
+        key = keys.get(ordinal)
+        if key is None:
+            key = keys[ordinal] = date.fromordinal(ordinal).isoformat()
+        out.append(key)
+    return out
+
+
+def _list_columns(mapping, ordinal, typecode="i"):
+    """Ordinal, count and value columns of a ``{day: [values]}`` mapping"""
+    days = sorted(mapping)
+    return [
+        _int_array(ordinal(day) for day in days),
+        _int_array(len(mapping[day]) for day in days),
+        _int_array((value for day in days for value in mapping[day]), typecode),
+    ]
+
+
+def _read_lists(body, offset, n_days, n_values, keys, typecode="i"):
+    """Rebuild a ``{day: [values]}`` mapping from its columns"""
+    ordinals, offset = _read_ints(body, offset, n_days)
+    counts, offset = _read_ints(body, offset, n_days)
+    values, offset = _read_ints(body, offset, n_values, typecode)
+
+    values = values.tolist()
+    mapping = {}
+    start = 0
+    for day, count in zip(_day_keys(ordinals, keys), counts):
+        mapping[day] = values[start:start + count]
+        start += count
+    return mapping, offset
+
+
+def _pack_lists(lists, ordinal):
+    """Layout entries and columns of ``{field: {day: [values]}}``"""
+    layout, columns = [], []
+    for name, mapping in lists.items():
+        typecode = DAY_LISTS[name]
+        field_columns = _list_columns(mapping, ordinal, typecode)
+        layout.append([name, typecode, len(field_columns[0]), len(field_columns[2])])
+        columns.extend(field_columns)
+    return layout, columns
+
+
+def _unpack_lists(body, offset, layout, keys):
+    """Undo ``_pack_lists``"""
+    lists = {}
+    for name, typecode, n_days, n_values in layout:
+        lists[name], offset = _read_lists(body, offset, n_days, n_values, keys, typecode)
+    return lists, offset
+
+
+def _rows_to_days(rows):
+    """``{day: counters}`` of ``[day, *counters]`` checkpoint rows"""
+    return {row[0]: row[1:] for row in rows}
+
+
+def _days_to_rows(mapping):
+    """Undo ``_rows_to_days``, in day order"""
+    return [[day] + values for day, values in mapping.items()]
+
+
+def _to_ordinal(day):
+    """Day ordinal of a date key"""
+    return date.fromisoformat(day).toordinal()
+
+
+def _day_lists(user):
+    """The ``DAY_LISTS`` fields of a profile as ``{day: [values]}`` mappings"""
+    return {"completion_history": user["completion_history"],
+            "completion_times": user.get("completion_times", {}),
+            "checkpoints": _rows_to_days(user.get("checkpoints", []))}
+
+
+def _set_day_lists(user, lists):
+    """Put unpacked ``DAY_LISTS`` fields back into a profile"""
+    for name, mapping in lists.items():
+        user[name] = _days_to_rows(mapping) if name == "checkpoints" else mapping
+
+
+def dumps(user, codec="zlib"):
+    """Pack a profile into snapshot bytes"""
+    if codec not in CODECS:
+        raise ValueError(f"Unknown snapshot codec: {codec}")
+    rollups = user.get("rollups")
+    day_rollups = {name: rollups[name] for name in DAY_ROLLUPS} if rollups else {}
+
+    rest = {k: v for k, v in user.items() if k not in DAY_LISTS}
+    if day_rollups:
+        rest["rollups"] = {k: v for k, v in rollups.items() if k not in DAY_ROLLUPS}
+    scalars = json.dumps(rest, separators=(",", ":")).encode()
+
+    ordinals = {}
+    def ordinal(day):
+        value = ordinals.get(day)
+        if value is None:
+            value = ordinals[day] = _to_ordinal(day)
+        return value
+
+    lists, columns = _pack_lists(_day_lists(user), ordinal)
+    rollup_sizes = []
+    for name, counter in day_rollups.items():
+        columns.append(_int_array(ordinal(day) for day in counter))
+        columns.append(_int_array(counter.values()))
+        rollup_sizes.append([name, len(counter)])
+    layout = json.dumps({"lists": lists, "rollups": rollup_sizes}, separators=(",", ":")).encode()
+
+    body = b"".join([_SIZES.pack(len(layout), len(scalars)), layout, scalars]
+                    + [column.tobytes() for column in columns])
+    header = _HEADER.pack(MAGIC, engine.SCHEMA_VERSION, CODECS[codec])
+    return header + _compress(body, codec)
+
+
+def _unpack_v3(body):
+    """Profile dict from a snapshot body written before ``LAYOUT_VERSION``"""
+    scalars_len, n_days, n_ids, *n_rollups = _V3_SIZES.unpack_from(body)
+    offset = _V3_SIZES.size
+    user = json.loads(body[offset:offset + scalars_len])
+    offset += scalars_len
+    keys = {}
+    user["completion_history"], offset = _read_lists(body, offset, n_days, n_ids, keys)
+
+    if "rollups" in user:
+        for name, size in zip(DAY_ROLLUPS, n_rollups):
+            days, offset = _read_ints(body, offset, size)
+            values, offset = _read_ints(body, offset, size)
+            user["rollups"][name] = dict(zip(_day_keys(days, keys), values.tolist()))
+    return user
+
+
+def _unpack(data):
+    """Profile dict from packed snapshot bytes"""
+    _, version, codec = _HEADER.unpack_from(data)
+    body = _decompress(data[_HEADER.size:], _CODEC_NAMES[codec])
+    if version < LAYOUT_VERSION:
+        user = _unpack_v3(body)
+        user.setdefault("schema_version", version)
+        return user
+
+    layout_len, scalars_len = _SIZES.unpack_from(body)
+    offset = _SIZES.size
+    layout = json.loads(body[offset:offset + layout_len])
+    offset += layout_len
+    user = json.loads(body[offset:offset + scalars_len])
+    offset += scalars_len
+    keys = {}
+    lists, offset = _unpack_lists(body, offset, layout["lists"], keys)
+    _set_day_lists(user, lists)
+    for name, size in layout["rollups"]:
+        days, offset = _read_ints(body, offset, size)
+        values, offset = _read_ints(body, offset, size)
+        user["rollups"][name] = dict(zip(_day_keys(days, keys), values.tolist()))
+    user.setdefault("schema_version", version)
+    return user
+
+
+def is_packed(data):
+    """True if ``data`` starts with the packed snapshot header"""
+    return data[:len(MAGIC)] == MAGIC
+
+
+def loads(data):
+    """Profile from packed snapshot bytes or legacy JSON, migrated to the current schema"""
+    if is_packed(data):
+        user = _unpack(data)
+    else:
+        user = json.loads(data)
+    return engine.migrate_profile(user)
+
+
+# History segments
+
+_SEGMENT_SIZES = struct.Struct("<I")
+# Before LAYOUT_VERSION: visited days, completions
+_V3_SEGMENT_SIZES = struct.Struct("<II")
+
+
+def pack_segment(lists, codec="zlib"):
+    """Pack ``{field: {day: [values]}}`` of ``DAY_LISTS`` fields as columns
+
+    Checkpoints are given as ``{day: counters}`` here, as ``unpack_segment``
+    returns them.
+    """
+    layout, columns = _pack_lists(lists, _to_ordinal)
+    layout = json.dumps(layout, separators=(",", ":")).encode()
+    body = b"".join([_SEGMENT_SIZES.pack(len(layout)), layout] + [column.tobytes() for column in columns])
+    return _HEADER.pack(MAGIC, engine.SCHEMA_VERSION, CODECS[codec]) + _compress(body, codec)
+
+
+def unpack_segment(data):
+    """Undo ``pack_segment``; older segments hold only ``completion_history``"""
+    _, version, codec = _HEADER.unpack_from(data)
+    body = _decompress(data[_HEADER.size:], _CODEC_NAMES[codec])
+    if version < LAYOUT_VERSION:
+        n_days, n_ids = _V3_SEGMENT_SIZES.unpack_from(body)
+        history, _ = _read_lists(body, _V3_SEGMENT_SIZES.size, n_days, n_ids, {})
+        return {"completion_history": history}
+    layout_len, = _SEGMENT_SIZES.unpack_from(body)
+    offset = _SEGMENT_SIZES.size
+    layout = json.loads(body[offset:offset + layout_len])
+    lists, _ = _unpack_lists(body, offset + layout_len, layout, {})
+    return lists
@@ -0,0 +1,1108 @@
+"""Profile persistence for the Daily Tracker.
+
+Three storage modes are available, picked with the ``TRACKER_STORAGE``
+environment variable:
+
+* ``json`` (default) rewrites the whole profile, but changes are only marked
+  dirty and written behind by a background thread, so a burst of clicks within
+  ``TRACKER_AUTOSAVE_WINDOW`` seconds costs one write (``0`` writes inline).
+* ``log`` appends one compact record per mutation to ``<name>.log`` and
+  periodically folds the log into the ``<name>.json`` snapshot, so the cost of
+  a click no longer grows with the length of the history.
+* ``sqlite`` keeps every profile in one shared database (``TRACKER_DB``) with
+  tasks, timestamped completions, per-day counters and checkpoint rows in
+  their own indexed tables, so each mutation touches a handful of rows.
+
+Snapshots are written in the packed binary format of ``tracker_snapshot``
+(compressed with ``TRACKER_COMPRESSION``: ``zlib``, ``lzma`` or ``none``), or
+as JSON with ``TRACKER_SNAPSHOT=json``.  Either kind is read back, and older
+files are migrated to the current schema on load.
+
+In the file-based modes, completion days older than ``TRACKER_HOT_DAYS``
+(default 90) are moved out of the in-memory profile into monthly columnar
+segments under ``<name>.archive/``, along with their undo checkpoint rows,
+whenever a profile is loaded or saved, so a session holds only the hot
+window.  Exports and the Stats look-back read the segments lazily, one
+month at a time.
+
+Profiles are addressed by file name in every mode; the SQLite backend keys
+them by the name without its extension, and ``profile_filename`` maps a
+username to its own shard.  Snapshots are always written to a temporary file,
+fsynced and renamed over the old one, so a crash mid-write leaves the
+previous snapshot intact.  Writes (and the snapshot + log read on load) hold
+an advisory ``flock`` on ``<name>.lock`` so several server processes can share
+``DATA_DIR``; platforms without ``fcntl`` only get the in-process locks.
+
+Every write also queues the player's scores for a small leaderboard index
+(``leaderboard.idx``, see ``tracker_leaderboard``), so ranking players never
+means opening their profiles.  Queued scores are written together once per
+autosave window, snapshot save or leaderboard read, not on every click.
+
+``ProfileCache`` keeps parsed profiles in an LRU shared by every session of a
+process and hands the same dict to all sessions of one user, parsing a file
+again only when another process changed it.
+"""
+import atexit
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import re
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from itertools import groupby
+
+import tracker_engine as engine
+import tracker_leaderboard as leaderboard
+import tracker_snapshot as snapshot
+import tracker_trace as trace
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory file locks on this platform
+    fcntl = None
+
+DATA_DIR = "user_data"
+DEFAULT_FILE = "tracker_data.json"
+STORAGE_MODE = os.environ.get("TRACKER_STORAGE", "json")
+COMPACT_EVERY = int(os.environ.get("TRACKER_COMPACT_EVERY", "500"))
+DB_PATH = os.environ.get("TRACKER_DB", os.path.join(DATA_DIR, "tracker.db"))
+SNAPSHOT_FORMAT = os.environ.get("TRACKER_SNAPSHOT", "packed")
+SNAPSHOT_CODEC = os.environ.get("TRACKER_COMPRESSION", "zlib")
+AUTOSAVE_WINDOW = float(os.environ.get("TRACKER_AUTOSAVE_WINDOW", "1.0"))
+PROFILE_CACHE_SIZE = int(os.environ.get("TRACKER_PROFILE_CACHE", "256"))
+HOT_DAYS = int(os.environ.get("TRACKER_HOT_DAYS", "90"))
+SEGMENT_CACHE_SIZE = 12
+
+if not os.path.exists(DATA_DIR):
+    os.makedirs(DATA_DIR)
+
+# Records appended since the last compaction, per log file
+_log_lengths = {}
+
+# Shards and file locks
+
+# File names this thread holds a file lock on
+_held_file_locks = threading.local()
+
+# Profile signature right after this process last wrote it, per file name
+_written_signatures = {}
+# Profile signature this process last read or wrote, per file name
+_seen_signatures = {}
+
+
+def profile_filename(username):
+    """Shard file name of a username; no username means the default profile"""
+    slug = re.sub(r"[^a-z0-9_-]+", "_", (username or "").strip().lower()).strip("_")
+    return f"{slug}.json" if slug else DEFAULT_FILE
+
+
+@contextmanager
+def _file_lock(filename, shared=False):
+    """Advisory lock on a profile against other processes, re-entrant per thread
+
+    A thread that already holds the lock (in either mode) just proceeds.
+    """
+    held = getattr(_held_file_locks, "names", None)
+    if held is None:
+        held = _held_file_locks.names = set()
+    if fcntl is None or filename in held:
+        yield
+        return
+    lock_path = os.path.join(DATA_DIR, os.path.splitext(filename)[0] + ".lock")
+    with open(lock_path, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        held.add(filename)
+        try:
+            yield
+        finally:
+            held.discard(filename)
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _mtime(path):
+    """Modification time of ``path`` in nanoseconds, or None if it is missing"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def profile_signature(filename=DEFAULT_FILE):
+    """Cheap token that changes whenever a profile is rewritten on disk
+
+    In the SQLite backend it is the database's ``data_version``, which moves
+    when any other connection commits.
+    """
+    if STORAGE_MODE == "sqlite":
+        with _db_lock:
+            return ("db", _connect().execute("PRAGMA data_version").fetchone()[0])
+    return (_mtime(os.path.join(DATA_DIR, filename)), _mtime(_log_path(filename)))
+
+
+def _remember_write(filename):
+    """Note the signature our own write left, so caches don't reload over it"""
+    _written_signatures[filename] = _seen_signatures[filename] = profile_signature(filename)
+
+# JSON / log backend
+
+def _log_path(filename):
+    """Path of the event log that belongs to a snapshot file"""
+    return os.path.join(DATA_DIR, os.path.splitext(filename)[0] + ".log")
+
+
+def _serialize_snapshot(user):
+    """Profile as snapshot bytes"""
+    if SNAPSHOT_FORMAT == "packed":
+        return snapshot.dumps(user, SNAPSHOT_CODEC)
+    if STORAGE_MODE == "log":
+        return json.dumps(user, separators=(",", ":")).encode()
+    return json.dumps(user, indent=4).encode()
+
+
+def _atomic_write(filepath, data):
+    """Replace ``filepath`` with ``data`` via a fsynced temporary file"""
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+        trace.add_bytes(len(data))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _read_log(filename):
+    """Read the mutation records appended since the last snapshot"""
+    events = []
+    try:
+        with open(_log_path(filename), 'r') as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    # A torn final line from a crash mid-append
+                    break
+    except FileNotFoundError:
+        pass
+    _log_lengths[filename] = len(events)
+    return events
+
+
+def append_event(user, event, filename=DEFAULT_FILE):
+    """Append one mutation record to the log, compacting when it grows long"""
+    try:
+        line = json.dumps(event, separators=(",", ":")) + "\n"
+        with _file_lock(filename):
+            with open(_log_path(filename), 'a') as f:
+                f.write(line)
+            _remember_write(filename)
+        trace.add_bytes(len(line))
+        _queue_leaderboard(filename, leaderboard.scores_of(user))
+        _log_lengths[filename] = _log_lengths.get(filename, 0) + 1
+        if _log_lengths[filename] >= COMPACT_EVERY:
+            return save_user_data(user, filename)
+        return True, _log_path(filename)
+    except Exception as e:
+        return False, str(e)
+
+# Write-behind autosave
+
+# Profiles marked dirty but not yet written, by file name, with the signature
+# the file had when the first of their changes was deferred
+_dirty = {}
+# Leaderboard scores not yet written to the index, by file name; also
+# guarded by ``_dirty_cond`` and flushed with the pending profiles
+_pending_scores = {}
+_dirty_cond = threading.Condition()
+_autosave_thread = None
+
+# Guards a profile dict against being serialized mid-mutation, per file name
+_profile_locks = {}
+_profile_locks_guard = threading.Lock()
+
+# Serialization counter and the newest one written, per file name, so a slow
+# background write can never overwrite a newer explicit save
+_write_seq = 0
+_written_seq = {}
+_write_lock = threading.Lock()
+
+
+def profile_lock(filename=DEFAULT_FILE):
+    """Lock to hold while mutating a profile that may be autosaved"""
+    with _profile_locks_guard:
+        lock = _profile_locks.get(filename)
+        if lock is None:
+            lock = _profile_locks[filename] = threading.RLock()
+        return lock
+
+
+@trace.traced("write_snapshot")
+def _save_snapshot(user, filename, expected=None):
+    """Serialize ``user`` under its profile lock and write it atomically
+
+    With ``expected`` the write is skipped, returning None, when the file's
+    signature no longer matches it.
+    """
+    global _write_seq
+    with profile_lock(filename):
+        data = _serialize_snapshot(user)
+        scores = leaderboard.scores_of(user)
+        with _write_lock:
+            _write_seq += 1
+            seq = _write_seq
+    filepath = os.path.join(DATA_DIR, filename)
+    # Lock order everywhere: profile lock, file lock, then _write_lock
+    with _file_lock(filename), _write_lock:
+        if seq < _written_seq.get(filename, 0):
+            return filepath
+        if expected is not None and profile_signature(filename) != expected:
+            return None
+        _atomic_write(filepath, data)
+        _written_seq[filename] = seq
+        _remember_write(filename)
+    _queue_leaderboard(filename, scores)
+    return filepath
+
+
+def _autosave_worker():
+    """Wait for dirty profiles, let the window collect more changes, write once"""
+    while True:
+        with _dirty_cond:
+            while not _dirty and not _pending_scores:
+                _dirty_cond.wait()
+        time.sleep(AUTOSAVE_WINDOW)
+        with trace.background("autosave"):
+            flush_pending()
+
+
+def _wake_autosaver():
+    """Start the autosave thread if needed and let it see new work; hold ``_dirty_cond``"""
+    global _autosave_thread
+    if _autosave_thread is None or not _autosave_thread.is_alive():
+        _autosave_thread = threading.Thread(target=_autosave_worker, name="tracker-autosave",
+                                            daemon=True)
+        _autosave_thread.start()
+    _dirty_cond.notify()
+
+
+def mark_dirty(user, filename=DEFAULT_FILE):
+    """Schedule a background write of ``user``, coalescing with pending ones"""
+    if AUTOSAVE_WINDOW <= 0:
+        return save_user_data(user, filename)
+    with _dirty_cond:
+        base = _dirty[filename][1] if filename in _dirty else \
+            _seen_signatures.get(filename, profile_signature(filename))
+        _dirty[filename] = (user, base)
+        _wake_autosaver()
+    return True, os.path.join(DATA_DIR, filename)
+
+
+def flush_pending(filename=None):
+    """Write pending profiles now; all of them, or just ``filename``
+
+    A pending write is dropped when another process rewrote the file since
+    the change was deferred, so a stale profile never overwrites a newer save.
+    """
+    with _dirty_cond:
+        if filename is None:
+            batch = list(_dirty.items())
+            _dirty.clear()
+        elif filename in _dirty:
+            batch = [(filename, _dirty.pop(filename))]
+        else:
+            batch = []
+    for name, (user, base) in batch:
+        try:
+            _save_snapshot(user, name, expected=base)
+        except Exception:
+            # Keep it dirty so the next flush retries
+            with _dirty_cond:
+                _dirty.setdefault(name, (user, base))
+                _dirty_cond.notify()
+            if filename is not None:
+                raise
+    _flush_leaderboard()
+
+
+# Whatever is still pending goes out when the server shuts down
+atexit.register(flush_pending)
+
+# Cold archive
+
+# Segment path -> (mtime, {field: {day: values}}) of recently read months
+_segments = OrderedDict()
+_segments_lock = threading.Lock()
+
+
+def _archive_dir(filename):
+    """Directory holding the monthly history segments of a profile"""
+    return os.path.join(DATA_DIR, os.path.splitext(filename)[0] + ".archive")
+
+
+def _segment_path(filename, month):
+    """Path of one month's history segment"""
+    return os.path.join(_archive_dir(filename), f"{month}.seg")
+
+
+def _read_segment(filename, month):
+    """Archived fields of one month, cached while unchanged on disk
+
+    ``{"completion_history": {day: [task ids]}, "checkpoints": {day: counters}}``,
+    either possibly missing.
+    """
+    path = _segment_path(filename, month)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    with _segments_lock:
+        entry = _segments.get(path)
+        if entry is not None and entry[0] == mtime:
+            _segments.move_to_end(path)
+            return entry[1]
+
+    with open(path, 'rb') as f:
+        segment = snapshot.unpack_segment(f.read())
+    with _segments_lock:
+        _segments[path] = (mtime, segment)
+        while len(_segments) > SEGMENT_CACHE_SIZE:
+            _segments.popitem(last=False)
+    return segment
+
+
+def _padded(stamps, count):
+    """``stamps`` with 0 put in front for completions older than their timestamps"""
+    return [0] * (count - len(stamps)) + stamps
+
+
+def _hot_cutoff(now=None):
+    """First day of the hot window"""
+    return ((now or datetime.now()) - timedelta(days=HOT_DAYS)).strftime(engine.DATE_FORMAT)
+
+
+def archive_cold_history(user, filename=DEFAULT_FILE, now=None):
+    """Move days and checkpoint rows older than the hot window into the profile's monthly segments
+
+    Touched segments drop the ids of quests deleted since, whose completions
+    live on only in the per-day counters.  Segments are written before the
+    snapshot that stops holding their days, so after a crash the days are
+    still hot and get archived again; a profile without an archive summary
+    therefore discards any segments left on disk.  In ``sqlite`` mode the
+    days are only dropped from memory.  Returns how many days moved.
+    """
+    before = _hot_cutoff(now)
+    if STORAGE_MODE == "sqlite":
+        # Cold rows stay in the tables, where range queries reach them; only
+        # the in-memory copy is trimmed
+        with profile_lock(filename):
+            return len(engine.archive_history(user, before).get("completion_history", ()))
+    with profile_lock(filename), _file_lock(filename):
+        archive = user.get("archive")
+        if archive is None and os.path.isdir(_archive_dir(filename)):
+            shutil.rmtree(_archive_dir(filename))
+        archived_before = archive["before"] if archive else None
+        cold = engine.archive_history(user, before)
+        if not cold:
+            return 0
+
+        by_month = {}
+        for field, days in cold.items():
+            for day, values in days.items():
+                by_month.setdefault(day[:7], {}).setdefault(field, {})[day] = values
+        index = engine.get_task_index(user)
+        os.makedirs(_archive_dir(filename), exist_ok=True)
+        for month, fields in by_month.items():
+            stored = _read_segment(filename, month)
+            history = dict(stored.get("completion_history", {}))
+            times = dict(stored.get("completion_times", {}))
+            for day, task_ids in fields.get("completion_history", {}).items():
+                stamps = _padded(fields.get("completion_times", {}).get(day, []), len(task_ids))
+                if archived_before is not None and day < archived_before and day in history:
+                    # Back-filled after its month was archived
+                    stamps = _padded(times.get(day, []), len(history[day])) + stamps
+                    task_ids = history[day] + task_ids
+                history[day] = task_ids
+                times[day] = stamps
+            for day, task_ids in history.items():
+                kept = [(task_id, at) for task_id, at in zip(task_ids, _padded(times.get(day, []), len(task_ids)))
+                        if task_id in index]
+                history[day] = [task_id for task_id, _ in kept]
+                times[day] = [at for _, at in kept]
+            checkpoints = dict(stored.get("checkpoints", {}), **fields.get("checkpoints", {}))
+            data = snapshot.pack_segment({"completion_history": history, "completion_times": times,
+                                          "checkpoints": checkpoints}, SNAPSHOT_CODEC)
+            _atomic_write(_segment_path(filename, month), data)
+        return len(cold["completion_history"])
+
+# SQLite backend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    user TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    user TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    exp INTEGER NOT NULL,
+    category TEXT,
+    PRIMARY KEY (user, id)
+);
+CREATE TABLE IF NOT EXISTS completions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    day TEXT NOT NULL,
+    task_id INTEGER,
+    at INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_completions_user_day ON completions (user, day);
+CREATE INDEX IF NOT EXISTS idx_completions_user_task ON completions (user, task_id);
+CREATE TABLE IF NOT EXISTS day_rollups (
+    user TEXT NOT NULL,
+    day TEXT NOT NULL,
+    completions INTEGER NOT NULL,
+    exp INTEGER NOT NULL,
+    PRIMARY KEY (user, day)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    user TEXT NOT NULL,
+    day TEXT NOT NULL,
+    counters TEXT NOT NULL,
+    PRIMARY KEY (user, day)
+);
+"""
+
+# Keys stored in their own tables rather than the profile row; the archive
+# summary is derived from the tables on load
+_TABLE_KEYS = ("daily_tasks", "completion_history", "completion_times", "checkpoints", "archive")
+# Date-keyed rollup counters, stored in ``day_rollups``
+_DAY_ROLLUPS = ("per_day", "exp_per_day")
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def _connect():
+    """Shared connection to the profile database"""
+    global _db
+    if _db is None:
+        _db = sqlite3.connect(DB_PATH, check_same_thread=False)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.executescript(SCHEMA)
+        if "at" not in {column[1] for column in _db.execute("PRAGMA table_info(completions)")}:
+            # Databases created before completions were timestamped
+            _db.execute("ALTER TABLE completions ADD COLUMN at INTEGER NOT NULL DEFAULT 0")
+    return _db
+
+
+def _profile_key(filename):
+    """Database key of a profile file name"""
+    return os.path.splitext(filename)[0]
+
+
+def _profile_row(user):
+    """Serialize the scalar part of a profile
+
+    Everything that grows with the history lives in its own table, so this
+    row, rewritten on every mutation, stays the same size.
+    """
+    row = {k: v for k, v in user.items() if k not in _TABLE_KEYS}
+    if "rollups" in row:
+        row["rollups"] = {k: v for k, v in row["rollups"].items() if k not in _DAY_ROLLUPS}
+    return json.dumps(row, separators=(",", ":"))
+
+
+def _task_row(key, position, task):
+    """Row tuple for the tasks table"""
+    return (key, task["id"], position, task["name"], task["difficulty"],
+            task["exp"], task.get("category"))
+
+
+def _completion_rows(key, user, day):
+    """Row tuples for the completions of one day"""
+    task_ids = user["completion_history"][day]
+    if not task_ids:
+        # An empty day keeps one NULL row so it still counts as visited
+        return [(key, day, None, 0)]
+    stamps = _padded(user.get("completion_times", {}).get(day, []), len(task_ids))
+    return [(key, day, task_id, at) for task_id, at in zip(task_ids, stamps)]
+
+
+def _rollup_rows(key, user, days):
+    """Row tuples for the ``day_rollups`` of ``days`` that have counters"""
+    rollups = user.get("rollups")
+    if rollups is None:
+        return []
+    per_day, exp_per_day = (rollups[name] for name in _DAY_ROLLUPS)
+    return [(key, day, per_day.get(day, 0), exp_per_day.get(day, 0))
+            for day in days if day in per_day or day in exp_per_day]
+
+
+def _checkpoint_rows(key, rows):
+    """Row tuples for the checkpoints table"""
+    return [(key, row[0], json.dumps(row[1:])) for row in rows]
+
+
+def _sync_day(db, key, user, day):
+    """Rewrite the stored completions and counters of one day from the in-memory profile"""
+    db.execute("DELETE FROM completions WHERE user = ? AND day = ?", (key, day))
+    if day in user["completion_history"]:
+        db.executemany("INSERT INTO completions (user, day, task_id, at) VALUES (?, ?, ?, ?)",
+                       _completion_rows(key, user, day))
+    db.execute("DELETE FROM day_rollups WHERE user = ? AND day = ?", (key, day))
+    db.executemany("INSERT INTO day_rollups VALUES (?, ?, ?, ?)", _rollup_rows(key, user, [day]))
+
+
+def _write_profile(db, key, user):
+    """Replace every row of a profile
+
+    Days before the archive cutoff are not in memory and keep their rows.
+    """
+    before = user.get("archive", {}).get("before", "")
+    db.execute("INSERT OR REPLACE INTO profiles (user, data) VALUES (?, ?)",
+               (key, _profile_row(user)))
+    db.execute("DELETE FROM tasks WHERE user = ?", (key,))
+    db.executemany("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                   [_task_row(key, i, t) for i, t in enumerate(user["daily_tasks"])])
+    db.execute("DELETE FROM completions WHERE user = ? AND day >= ?", (key, before))
+    db.executemany("INSERT INTO completions (user, day, task_id, at) VALUES (?, ?, ?, ?)",
+                   [row for day in user["completion_history"] for row in _completion_rows(key, user, day)])
+    db.execute("DELETE FROM day_rollups WHERE user = ?", (key,))
+    rollups = user.get("rollups") or {}
+    days = set(rollups.get("per_day", ())) | set(rollups.get("exp_per_day", ()))
+    db.executemany("INSERT INTO day_rollups VALUES (?, ?, ?, ?)", _rollup_rows(key, user, sorted(days)))
+    db.execute("DELETE FROM checkpoints WHERE user = ? AND day >= ?", (key, before))
+    db.executemany("INSERT INTO checkpoints VALUES (?, ?, ?)",
+                   _checkpoint_rows(key, user.get("checkpoints", [])))
+
+
+def _sqlite_archive(db, key, before):
+    """Archive summary of the rows before ``before``, or None if there are none
+
+    Like ``engine.archive_history`` builds it, but from indexed queries: the
+    streak run is walked back from the last cold active day only as far as
+    it reaches.
+    """
+    first_day = db.execute("SELECT MIN(day) FROM completions WHERE user = ? AND day < ?",
+                           (key, before)).fetchone()[0]
+    first_checkpoint = db.execute("SELECT MIN(day) FROM checkpoints WHERE user = ? AND day < ?",
+                                  (key, before)).fetchone()[0]
+    if first_day is None and first_checkpoint is None:
+        return None
+    run = 0
+    last_active_day = previous = None
+    for day, in db.execute("SELECT DISTINCT day FROM completions WHERE user = ? AND day < ? "
+                           "AND task_id IS NOT NULL ORDER BY day DESC", (key, before)):
+        ordinal = date.fromisoformat(day).toordinal()
+        if previous is None:
+            last_active_day = day
+        elif ordinal != previous - 1:
+            break
+        run += 1
+        previous = ordinal
+    max_task_id = db.execute("SELECT MAX(task_id) FROM completions WHERE user = ?", (key,)).fetchone()[0]
+    archive = {"before": before, "months": [], "run": run, "last_active_day": last_active_day,
+               "max_task_id": max_task_id or 0}
+    if first_checkpoint is not None:
+        archive["first_checkpoint"] = first_checkpoint
+    return archive
+
+
+def _sqlite_save(user, filename):
+    """Replace a whole profile in the database"""
+    key = _profile_key(filename)
+    with _db_lock:
+        db = _connect()
+        with db:
+            _write_profile(db, key, user)
+    _queue_leaderboard(filename, leaderboard.scores_of(user))
+    _flush_leaderboard()
+
+
+def _sqlite_record(user, event, filename):
+    """Persist one applied mutation by touching only the rows it changed"""
+    key = _profile_key(filename)
+    op = event["op"]
+    with _db_lock:
+        db = _connect()
+        with db:
+            db.execute("INSERT OR REPLACE INTO profiles (user, data) VALUES (?, ?)",
+                       (key, _profile_row(user)))
+            if op in ("complete", "undo"):
+                _sync_day(db, key, user, event["at"][:10])
+            elif op == "add_task":
+                position = db.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM tasks WHERE user = ?",
+                                      (key,)).fetchone()[0]
+                db.execute("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           _task_row(key, position, user["daily_tasks"][-1]))
+            elif op == "delete_task":
+                row = db.execute("SELECT position FROM tasks WHERE user = ? AND id = ?",
+                                 (key, event["task_id"])).fetchone()
+                db.execute("DELETE FROM tasks WHERE user = ? AND id = ?", (key, event["task_id"]))
+                if row is not None:
+                    # The engine moved the last quest into the deleted one's place
+                    db.execute("UPDATE tasks SET position = ? WHERE user = ? AND position = "
+                               "(SELECT MAX(position) FROM tasks WHERE user = ?) AND position > ?",
+                               (row[0], key, key, row[0]))
+            elif op == "season" or (op == "rollover" and not user["completion_history"]):
+                # A rollover into a new season also clears the history
+                db.execute("DELETE FROM completions WHERE user = ?", (key,))
+                db.execute("DELETE FROM day_rollups WHERE user = ?", (key,))
+            if op in ("season", "rollover"):
+                # Both may start a new season, which drops the checkpoint rows
+                db.execute("DELETE FROM checkpoints WHERE user = ?", (key,))
+                rows = user["checkpoints"]
+            else:
+                # Other events append at most one row
+                rows = user["checkpoints"][-1:]
+            db.executemany("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)",
+                           _checkpoint_rows(key, rows))
+    _queue_leaderboard(filename, leaderboard.scores_of(user))
+
+
+def _sqlite_load(filename):
+    """Assemble a profile dict from the database
+
+    Only completions and checkpoint rows of the hot window are read; older
+    ones stay in their tables behind an archive summary, as in the file modes.
+    """
+    key = _profile_key(filename)
+    before = _hot_cutoff()
+    with _db_lock:
+        db = _connect()
+        row = db.execute("SELECT data FROM profiles WHERE user = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        user = json.loads(row[0])
+        # Saved while timestamps, checkpoint rows and day counters lived in the profile row
+        legacy = ("completion_times" in user or "checkpoints" in user
+                  or "per_day" in user.get("rollups", {}))
+        user["daily_tasks"] = [
+            {"id": task_id, "name": name, "difficulty": difficulty, "exp": exp, "category": category}
+            for task_id, name, difficulty, exp, category in db.execute(
+                "SELECT id, name, difficulty, exp, category FROM tasks WHERE user = ? ORDER BY position",
+                (key,))
+        ]
+        # Rows of the old layout are moved over whole, then trimmed in memory
+        first_day = "" if legacy else before
+        history = {}
+        times = {}
+        for day, task_id, at in db.execute(
+                "SELECT day, task_id, at FROM completions WHERE user = ? AND day >= ? ORDER BY day, seq",
+                (key, first_day)):
+            completed = history.setdefault(day, [])
+            stamps = times.setdefault(day, [])
+            if task_id is not None:
+                completed.append(task_id)
+                stamps.append(at)
+        user["completion_history"] = history
+        user.setdefault("completion_times", times)
+        rollups = user.get("rollups")
+        if rollups is not None and "per_day" not in rollups:
+            rollups.update(per_day={}, exp_per_day={})
+            for day, completions, exp in db.execute(
+                    "SELECT day, completions, exp FROM day_rollups WHERE user = ?", (key,)):
+                if completions:
+                    rollups["per_day"][day] = completions
+                if exp:
+                    rollups["exp_per_day"][day] = exp
+        if "checkpoints" not in user:
+            user["checkpoints"] = [
+                [day] + json.loads(counters) for day, counters in db.execute(
+                    "SELECT day, counters FROM checkpoints WHERE user = ? AND day >= ? ORDER BY day",
+                    (key, first_day))
+            ]
+        if legacy:
+            # Move them into their tables once
+            user.pop("archive", None)
+            with db:
+                _write_profile(db, key, user)
+            engine.archive_history(user, before)
+        else:
+            archive = _sqlite_archive(db, key, before)
+            if archive is not None:
+                user["archive"] = archive
+        return engine.migrate_profile(user)
+
+# Public API
+
+@trace.traced("save_user_data")
+def save_user_data(user, filename=DEFAULT_FILE):
+    """Save user data to JSON file
+
+    In ``log`` mode this is the compaction step: the snapshot is rewritten and
+    the event log truncated.  In ``sqlite`` mode the profile's rows are replaced.
+    """
+    try:
+        if STORAGE_MODE == "sqlite":
+            _sqlite_save(user, filename)
+            return True, DB_PATH
+        # This write supersedes anything still waiting for the autosaver
+        with _dirty_cond:
+            _dirty.pop(filename, None)
+        # Readers must never see the new snapshot next to the old log
+        with profile_lock(filename), _file_lock(filename):
+            archive_cold_history(user, filename)
+            filepath = _save_snapshot(user, filename)
+            if STORAGE_MODE == "log":
+                open(_log_path(filename), 'w').close()
+                _log_lengths[filename] = 0
+                _remember_write(filename)
+        _flush_leaderboard()
+        return True, filepath
+    except Exception as e:
+        return False, str(e)
+
+
+def record_change(user, event, filename=DEFAULT_FILE):
+    """Persist a mutation that has already been applied to ``user``"""
+    if STORAGE_MODE == "log":
+        return append_event(user, event, filename)
+    if STORAGE_MODE == "sqlite":
+        try:
+            _sqlite_record(user, event, filename)
+            return True, DB_PATH
+        except Exception as e:
+            return False, str(e)
+    return mark_dirty(user, filename)
+
+
+@trace.traced("load_user_data")
+def load_user_data(filename=DEFAULT_FILE):
+    """Load user data from JSON file, replaying any logged mutations"""
+    try:
+        if STORAGE_MODE == "sqlite":
+            return _sqlite_load(filename)
+
+        flush_pending(filename)
+        filepath = os.path.join(DATA_DIR, filename)
+        user = None
+        with _file_lock(filename, shared=True):
+            if os.path.exists(filepath):
+                with open(filepath, 'rb') as f:
+                    user = snapshot.loads(f.read())
+            events = _read_log(filename)
+            _seen_signatures[filename] = profile_signature(filename)
+
+        if events:
+            user = user or engine.new_user_data()
+            for event in events:
+                engine.apply_event(user, event)
+        if user:
+            archive_cold_history(user, filename)
+        return user
+    except Exception as e:
+        return None
+
+
+def get_saved_files():
+    """Get list of all saved data files"""
+    try:
+        if STORAGE_MODE == "sqlite":
+            with _db_lock:
+                rows = _connect().execute("SELECT user FROM profiles ORDER BY user").fetchall()
+            return [f"{key}.json" for key, in rows]
+        files = [f for f in os.listdir(DATA_DIR) if f.endswith('.json')]
+        return files
+    except:
+        return []
+
+
+def delete_save_file(filename):
+    """Delete a saved data file"""
+    try:
+        if STORAGE_MODE == "sqlite":
+            key = _profile_key(filename)
+            with _db_lock:
+                db = _connect()
+                with db:
+                    deleted = db.execute("DELETE FROM profiles WHERE user = ?", (key,)).rowcount
+                    db.execute("DELETE FROM tasks WHERE user = ?", (key,))
+                    db.execute("DELETE FROM completions WHERE user = ?", (key,))
+                    db.execute("DELETE FROM day_rollups WHERE user = ?", (key,))
+                    db.execute("DELETE FROM checkpoints WHERE user = ?", (key,))
+            _remove_from_leaderboard(filename)
+            return deleted > 0
+        with _dirty_cond:
+            _dirty.pop(filename, None)
+        filepath = os.path.join(DATA_DIR, filename)
+        _remove_from_leaderboard(filename)
+        with _file_lock(filename):
+            if os.path.exists(_log_path(filename)):
+                os.remove(_log_path(filename))
+            _log_lengths.pop(filename, None)
+            if os.path.isdir(_archive_dir(filename)):
+                shutil.rmtree(_archive_dir(filename))
+            if os.path.exists(filepath):
+                os.remove(filepath)
+                return True
+    except:
+        return False
+
+# Leaderboard index
+
+LEADERBOARD_FILE = "leaderboard.idx"
+# File lock name of the index; profile slugs never start with a dot, so it
+# cannot share ``<stem>.lock`` with a profile named "leaderboard"
+LEADERBOARD_LOCK = ".leaderboard-index"
+
+# The parsed index and the mtime of the file it was read from or written to
+_leaderboard = {"mtime": None, "index": None}
+_leaderboard_lock = threading.Lock()
+
+
+def _leaderboard_path():
+    """Path of the persisted leaderboard index"""
+    return os.path.join(DATA_DIR, LEADERBOARD_FILE)
+
+
+def _read_leaderboard():
+    """Current index, parsed again only after another process rewrote it; hold the lock"""
+    mtime = _mtime(_leaderboard_path())
+    if _leaderboard["index"] is None or mtime != _leaderboard["mtime"]:
+        index = None
+        if mtime is not None:
+            try:
+                with open(_leaderboard_path(), 'r') as f:
+                    index = json.load(f)
+            except ValueError:
+                # Unreadable; start over until the next rebuild
+                index = None
+        if index is None or index.get("version") != leaderboard.INDEX_VERSION:
+            index = leaderboard.new_index()
+        _leaderboard.update(mtime=mtime, index=index)
+    return _leaderboard["index"]
+
+
+def _write_leaderboard(index):
+    """Persist the index; hold the lock"""
+    _atomic_write(_leaderboard_path(), json.dumps(index, separators=(",", ":")).encode())
+    _leaderboard.update(mtime=_mtime(_leaderboard_path()), index=index)
+
+
+def _change_leaderboard(change):
+    """Apply ``change(index)`` and persist the index if it reports a change"""
+    try:
+        with _leaderboard_lock, _file_lock(LEADERBOARD_LOCK):
+            index = _read_leaderboard()
+            if change(index):
+                _write_leaderboard(index)
+    except OSError:
+        # Derived data: a failed update must not fail the save, and
+        # ``rebuild_leaderboard`` repairs the index
+        _leaderboard.update(mtime=None, index=None)
+
+
+def _queue_leaderboard(filename, scores):
+    """Record a profile's current scores with the next index write
+
+    Clicks only replace the queued scores; the index is rewritten once per
+    autosave window, snapshot save or leaderboard read.
+    """
+    with _dirty_cond:
+        _pending_scores[filename] = scores
+        if AUTOSAVE_WINDOW > 0:
+            _wake_autosaver()
+            return
+    _flush_leaderboard()
+
+
+def _flush_leaderboard():
+    """Write every queued score update to the index in one rewrite"""
+    with _dirty_cond:
+        batch = list(_pending_scores.items())
+        _pending_scores.clear()
+    if batch:
+        _change_leaderboard(lambda index: any([leaderboard.update(index, _profile_key(name), scores)
+                                               for name, scores in batch]))
+
+
+def _remove_from_leaderboard(filename):
+    """Drop a deleted profile from the index"""
+    with _dirty_cond:
+        _pending_scores.pop(filename, None)
+    _change_leaderboard(lambda index: leaderboard.remove(index, _profile_key(filename)))
+
+
+def leaderboard_view(metric, filename=DEFAULT_FILE, k=10):
+    """Top ``k`` ``(name, score)`` rows, ``filename``'s place (or None) and the player count"""
+    _flush_leaderboard()
+    with _leaderboard_lock:
+        index = _read_leaderboard()
+        return (leaderboard.top(index, metric, k),
+                leaderboard.position(index, metric, _profile_key(filename)),
+                leaderboard.size(index))
+
+
+def rebuild_leaderboard():
+    """Recompute the index from every saved profile, e.g. after losing the file"""
+    index = leaderboard.new_index()
+    for filename in get_saved_files():
+        user = load_user_data(filename)
+        if user is not None:
+            leaderboard.update(index, _profile_key(filename), leaderboard.scores_of(user))
+    with _leaderboard_lock, _file_lock(LEADERBOARD_LOCK):
+        _write_leaderboard(index)
+    return index
+
+# Shared profile cache
+
+class ProfileCache:
+    """LRU of loaded profiles shared by every session of a process
+
+    ``get`` hands all sessions of one user the same profile dict (mutations
+    are serialized by ``profile_lock``) and compares ``profile_signature``
+    with the one seen at load time, or left by this process's own last write,
+    so a file is parsed again only after another process changed it.
+    """
+
+    def __init__(self, size=PROFILE_CACHE_SIZE):
+        self.size = size
+        # file name -> (signature, profile)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, filename=DEFAULT_FILE):
+        """Shared profile of ``filename``, or None if there is none saved yet"""
+        signature = profile_signature(filename)
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None and signature in (entry[0], _written_signatures.get(filename)):
+                self._entries[filename] = (signature, entry[1])
+                self._entries.move_to_end(filename)
+                self.stats["hits"] += 1
+                return entry[1]
+            self.stats["misses"] += 1
+        user = load_user_data(filename)
+        if user is not None:
+            self.put(filename, user, signature)
+        return user
+
+    def put(self, filename, user, signature=None):
+        """Make ``user`` the shared profile of ``filename``"""
+        if signature is None:
+            signature = profile_signature(filename)
+        with self._lock:
+            self._entries[filename] = (signature, user)
+            self._entries.move_to_end(filename)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def items(self):
+        """``(file name, profile)`` of every cached profile"""
+        with self._lock:
+            return [(filename, entry[1]) for filename, entry in self._entries.items()]
+
+    def info(self):
+        """Hit/miss counters plus the current cache size"""
+        return dict(self.stats, size=len(self._entries))
+
+# History queries
+
+def completions_per_day(user, start_day, end_day, filename=DEFAULT_FILE):
+    """Completions on each active day in ``[start_day, end_day]``
+
+    Hot days are counted in memory.  Archived ones come from a grouped range
+    query on the (user, day) index in ``sqlite`` mode, otherwise from the
+    month segments that overlap the range.
+    """
+    counts = {day: len(task_ids) for day, task_ids in user["completion_history"].items()
+              if start_day <= day <= end_day and task_ids}
+    archive = user.get("archive")
+    if archive is None or start_day >= archive["before"]:
+        return counts
+    if STORAGE_MODE == "sqlite":
+        with _db_lock:
+            archived = _connect().execute(
+                "SELECT day, COUNT(task_id) FROM completions "
+                "WHERE user = ? AND day >= ? AND day <= ? AND day < ? GROUP BY day",
+                (_profile_key(filename), start_day, end_day, archive["before"])).fetchall()
+    else:
+        archived = [(day, len(task_ids))
+                    for month in archive["months"] if start_day[:7] <= month <= end_day[:7]
+                    for day, task_ids in _read_segment(filename, month).get("completion_history", {}).items()
+                    if start_day <= day <= end_day]
+    for day, count in archived:
+        if count:
+            counts[day] = counts.get(day, 0) + count
+    return counts
+
+
+def _sqlite_cold_days(user, filename):
+    """``(day, task ids, timestamps)`` of the rows before the archive cutoff, by a range query"""
+    before = user.get("archive", {}).get("before")
+    if before is None:
+        return
+    with _db_lock:
+        rows = _connect().execute(
+            "SELECT day, task_id, at FROM completions WHERE user = ? AND day < ? ORDER BY day, seq",
+            (_profile_key(filename), before)).fetchall()
+    for day, group in groupby(rows, key=lambda row: row[0]):
+        group = [row for row in group if row[1] is not None]
+        yield day, [row[1] for row in group], [row[2] for row in group]
+
+
+def archived_days(user, filename=DEFAULT_FILE):
+    """``(day, task ids, timestamps)`` of the days moved out of memory, in date order"""
+    if STORAGE_MODE == "sqlite":
+        yield from _sqlite_cold_days(user, filename)
+        return
+    for month in user.get("archive", {}).get("months", ()):
+        segment = _read_segment(filename, month)
+        times = segment.get("completion_times", {})
+        for day, task_ids in sorted(segment.get("completion_history", {}).items()):
+            yield day, task_ids, _padded(times.get(day, []), len(task_ids))
+
+
+def history_days(user, filename=DEFAULT_FILE):
+    """Every ``(day, task ids, timestamps)`` of the profile in date order, archived days first
+
+    Timestamps are parallel to the task ids, 0 where a completion has none.
+    """
+    yield from archived_days(user, filename)
+    times = user.get("completion_times", {})
+    for day, task_ids in sorted(user["completion_history"].items()):
+        yield day, task_ids, _padded(times.get(day, []), len(task_ids))
+
+
+def _archived_checkpoints(user, first_month, filename):
+    """Archived ``[day, *counters]`` checkpoint rows from ``first_month`` on, in day order"""
+    if STORAGE_MODE == "sqlite":
+        before = user.get("archive", {}).get("before")
+        if before is None:
+            return
+        with _db_lock:
+            rows = _connect().execute(
+                "SELECT day, counters FROM checkpoints WHERE user = ? AND day >= ? AND day < ? ORDER BY day",
+                (_profile_key(filename), first_month, before)).fetchall()
+        for day, counters in rows:
+            yield [day] + json.loads(counters)
+        return
+    for month in user.get("archive", {}).get("months", ()):
+        if month >= first_month:
+            for day, counters in _read_segment(filename, month).get("checkpoints", {}).items():
+                yield [day] + counters
+
+
+def checkpoint_rows(user, filename=DEFAULT_FILE):
+    """Every checkpoint row of the profile in day order, archived rows first"""
+    yield from _archived_checkpoints(user, "", filename)
+    yield from user.get("checkpoints", [])
+
+
+def profile_on(user, day, filename=DEFAULT_FILE):
+    """``engine.profile_on``, reading checkpoint rows from the cold archive when ``day`` needs them"""
+    return engine.profile_on(user, day, _archived_checkpoints(user, day[:7], filename))
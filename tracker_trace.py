@@ -0,0 +1,180 @@
+"""Lightweight per-rerun tracing for the Daily Tracker.
+
+Sections of a rerun are wrapped in ``span(name)`` blocks, which nest into a
+tree per thread.  Each span records its wall time and the bytes written to
+disk inside it (reported by storage through ``add_bytes``).  A tree opened
+with ``rerun(name)`` (the whole script, or a fragment rerunning on its own) is
+kept in a ring buffer of the last ``TRACE_RERUNS`` reruns for the developer
+panel.  Those trees, and the ones opened with ``background(name)`` by worker
+threads such as the autosaver, are appended to a rotating JSONL file.  Every
+span, even one opened outside any tree (say during a batch replay), is summed
+into the counters that ``prometheus_text`` renders in the Prometheus text
+exposition format.
+
+Tracing is on by default; ``TRACKER_TRACE=0`` turns every span into a no-op.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+
+TRACING = os.environ.get("TRACKER_TRACE", "1") != "0"
+# Unset means ``trace.jsonl`` in the storage ``DATA_DIR``, resolved on first use
+TRACE_FILE = os.environ.get("TRACKER_TRACE_FILE")
+TRACE_MAX_BYTES = int(os.environ.get("TRACKER_TRACE_MAX_BYTES", str(5 * 1024 * 1024)))
+TRACE_BACKUPS = 3
+TRACE_RERUNS = 20
+
+# Open spans of the running thread, innermost last
+_local = threading.local()
+_reruns = deque(maxlen=TRACE_RERUNS)
+# Span name -> [calls, seconds, bytes written]
+_totals = {}
+_totals_lock = threading.Lock()
+_logger = None
+
+
+def _trace_path():
+    """Path of the JSONL trace file"""
+    if TRACE_FILE:
+        return TRACE_FILE
+    # Imported here: storage itself imports this module
+    import tracker_storage as storage
+    return os.path.join(storage.DATA_DIR, "trace.jsonl")
+
+
+def _trace_logger():
+    """Logger that appends one JSON line per finished tree to ``_trace_path()``"""
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger("tracker.trace")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        path = _trace_path()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+def _stack():
+    """Open spans of the current thread"""
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _finish(node, keep):
+    """Store a finished tree: ``"rerun"`` trees in the ring buffer too"""
+    if keep == "rerun":
+        _reruns.append(node)
+    try:
+        _trace_logger().info(json.dumps(node, separators=(",", ":")))
+    except OSError:
+        # Tracing must never break the app
+        pass
+
+
+@contextmanager
+def _span(name, keep):
+    """Open a span on this thread's stack and record it when it closes"""
+    stack = _stack()
+    node = {"name": name, "ms": 0.0, "bytes": 0, "children": []}
+    if stack:
+        stack[-1]["children"].append(node)
+    else:
+        node["at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    stack.append(node)
+    start = time.perf_counter()
+    try:
+        yield node
+    finally:
+        elapsed = time.perf_counter() - start
+        node["ms"] = round(elapsed * 1000, 3)
+        stack.pop()
+        with _totals_lock:
+            total = _totals.setdefault(name, [0, 0.0, 0])
+            total[0] += 1
+            total[1] += elapsed
+            total[2] += node["bytes"]
+        if stack:
+            stack[-1]["bytes"] += node["bytes"]
+        elif keep:
+            _finish(node, keep)
+
+
+def span(name):
+    """Time a section; nests under whatever span is open on this thread"""
+    return _span(name, None) if TRACING else nullcontext()
+
+
+def rerun(name):
+    """Like ``span``, but a tree rooted here is traced and kept for the developer panel"""
+    return _span(name, "rerun") if TRACING else nullcontext()
+
+
+def background(name):
+    """Like ``span``, but a tree rooted here is written to the trace file"""
+    return _span(name, "background") if TRACING else nullcontext()
+
+
+def traced(name, root=span):
+    """Decorator form of ``span``, or of ``rerun`` / ``background`` passed as ``root``"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with root(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def add_bytes(count):
+    """Charge ``count`` bytes written to the innermost open span"""
+    stack = getattr(_local, "stack", None)
+    if stack:
+        stack[-1]["bytes"] += count
+
+
+def recent_reruns():
+    """The last ``TRACE_RERUNS`` rerun trees, newest first"""
+    return list(reversed(_reruns))
+
+
+def format_tree(node, depth=0):
+    """Indented text lines for a span tree"""
+    size = f", {node['bytes']} B written" if node["bytes"] else ""
+    lines = [f"{'  ' * depth}{node['name']}: {node['ms']:.1f} ms{size}"]
+    for child in node["children"]:
+        lines.extend(format_tree(child, depth + 1))
+    return lines
+
+
+def prometheus_text():
+    """Span counters in the Prometheus text exposition format"""
+    with _totals_lock:
+        totals = sorted((name, list(values)) for name, values in _totals.items())
+    metrics = [
+        ("tracker_span_calls_total", "Finished spans by name", 0),
+        ("tracker_span_seconds_total", "Wall time spent in spans by name", 1),
+        ("tracker_span_bytes_written_total", "Bytes written to disk inside spans by name", 2),
+    ]
+    lines = []
+    for metric, help_text, field in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for name, values in totals:
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{metric}{{span="{label}"}} {values[field]:g}')
+    return "\n".join(lines) + "\n"
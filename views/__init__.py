@@ -0,0 +1 @@
+"""Page bodies of the Daily Tracker, imported on demand by the entry script."""
@@ -0,0 +1,116 @@
+"""Achievements page"""
+import streamlit as st
+
+import tracker_engine as engine
+from tracker_engine import ACHIEVEMENT_METRICS, CATEGORIES, DIFFICULTY_EXP, RANK_SYSTEM
+from tracker_session import commit_event, get_completion_streak
+
+
+def _metric_options():
+    """Every metric a custom achievement can track, with its label"""
+    options = dict(ACHIEVEMENT_METRICS)
+    options.update({f"category:{c}": f"{icon} {c.title()} tasks" for c, icon in CATEGORIES.items()})
+    options.update({f"difficulty:{d}": f"{d.title()} tasks" for d in DIFFICULTY_EXP})
+    return options
+
+
+def render():
+    """Render the page body"""
+    st.subheader("🏆 Achievements & Milestones")
+    achievements = engine.get_achievements(st.session_state.user_data)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("✅ Completed", st.session_state.user_data.get("total_tasks_completed", 0))
+    
+    with col2:
+        st.metric("🏅 Achievements", f"{len(st.session_state.user_data['achievements'])}/{len(achievements)}")
+    
+    with col3:
+        st.metric("🔥 Streak", f"{get_completion_streak()} days")
+    
+    with col4:
+        st.metric("⭐ Level", st.session_state.user_data['level'])
+    
+    st.divider()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("### 🎖️ Earned Achievements")
+        if st.session_state.user_data["achievements"]:
+            for ach_id in st.session_state.user_data["achievements"]:
+                ach = achievements.get(ach_id)
+                if ach:
+                    st.markdown(f"<div class='achievement-badge'>{ach['emoji']} {ach['name']}</div>", unsafe_allow_html=True)
+                    st.caption(ach["description"])
+        else:
+            st.info("🚀 Start completing tasks!")
+    
+    with col2:
+        st.write("### 🎯 Next Achievements")
+        next_count = 0
+        for ach_id, ach in achievements.items():
+            if ach_id not in st.session_state.user_data["achievements"] and next_count < 5:
+                st.write(f"**{ach['emoji']} {ach['name']}**")
+                st.caption(ach["description"])
+                next_count += 1
+    
+    st.divider()
+    
+    st.write("### 🎯 Custom Achievements")
+    custom = st.session_state.user_data.get("custom_achievements", {})
+    options = _metric_options()
+    for ach_id, ach in custom.items():
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            earned = "✅" if ach_id in st.session_state.user_data["achievements"] else "⭕"
+            st.write(f"{earned} **{ach['emoji']} {ach['name']}** — {options.get(ach['metric'], ach['metric'])} "
+                     f"≥ {ach['threshold']}")
+        with col2:
+            st.button("🗑️", key=f"delete_{ach_id}", on_click=commit_event,
+                      args=("delete_achievement",), kwargs={"ach_id": ach_id})
+    
+    with st.expander("Create your own achievement"):
+        col1, col2 = st.columns(2)
+        with col1:
+            name = st.text_input("Achievement Name", placeholder="e.g., Gym Rat")
+            metric = st.selectbox("Track", list(options), format_func=options.get, key="custom_metric")
+        with col2:
+            emoji = st.text_input("Emoji", "🎯")
+            if metric == "rank":
+                threshold = st.selectbox("Reach", [r["rank"] for r in RANK_SYSTEM], key="custom_rank")
+            else:
+                threshold = st.number_input("Reach", min_value=1, value=10, step=1)
+        
+        if st.button("✨ Add Achievement", type="primary"):
+            if name:
+                awarded = commit_event("add_achievement", name=name, metric=metric, threshold=threshold,
+                                       emoji=emoji or "🎯")
+                st.success(f"Achievement '{name}' added!" + (" Already earned! 🏆" if awarded else ""))
+                st.rerun()
+    
+    st.divider()
+    
+    st.write("### 📈 Progress")
+    total_tasks = st.session_state.user_data.get("total_tasks_completed", 0)
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.progress(min(total_tasks / 100, 1.0), text=f"{total_tasks}/100")
+        st.caption("Unstoppable")
+    
+    with col2:
+        streak = get_completion_streak()
+        st.progress(min(streak / 30, 1.0), text=f"{streak}/30")
+        st.caption("Month Streak")
+    
+    with col3:
+        st.progress(min(st.session_state.user_data['rank_points'] / 5000, 1.0),
+                    text=f"{st.session_state.user_data['rank_points']}/5000")
+        st.caption("Legend Rank")
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,88 @@
+"""Data manager page: save/load and backup download/upload"""
+import lzma
+from datetime import datetime
+
+import streamlit as st
+
+import tracker_engine as engine
+import tracker_export as export
+import tracker_storage as storage
+import tracker_trace as trace
+from tracker_session import current_profile, load_user_data, save_user_data, set_profile
+
+
+def render():
+    """Render the page body"""
+    st.subheader("💾 Data Management")
+    
+    tab1, tab2 = st.tabs(["Save/Load", "Download/Upload"])
+    
+    with tab1:
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("💾 Save Now", use_container_width=True):
+                save_user_data()
+                st.session_state.user_data["last_saved"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                engine.bump_revision(st.session_state.user_data)
+                st.success("✅ Saved!")
+        
+        with col2:
+            if st.button("📥 Load Now", use_container_width=True):
+                loaded = load_user_data()
+                if loaded:
+                    set_profile(loaded)
+                    st.success("✅ Loaded!")
+                    st.rerun()
+        
+        if st.session_state.user_data.get("last_saved"):
+            st.caption(f"Last saved: {st.session_state.user_data['last_saved']}")
+    
+    with tab2:
+        user = st.session_state.user_data
+        col1, col2 = st.columns(2)
+        with col1:
+            labels = {"ndjson": "Completions (NDJSON)", "csv": "Completions (CSV)",
+                      "gzip": "Full backup (gzip)", "lzma": "Full backup (xz)"}
+            fmt = st.selectbox("Export", list(export.EXPORT_FORMATS), format_func=labels.get, key="export_format")
+            # Built only on request and kept until anything in the profile changes
+            version = (fmt, id(user), user.get("revision", 0))
+            prepared = st.session_state.get("prepared_export")
+            if prepared and prepared[:3] != version:
+                prepared = None
+            if prepared is None and st.button("📦 Prepare Export", use_container_width=True):
+                with storage.profile_lock(current_profile()), trace.span("export"):
+                    data = b"".join(export.export(user, fmt, current_profile()))
+                prepared = st.session_state.prepared_export = version + (data,)
+            if prepared:
+                name, mime = export.EXPORT_FORMATS[fmt]
+                st.download_button("📥 Download", prepared[3],
+                                   file_name=f"tracker_{datetime.now().strftime('%Y%m%d')}_{name}",
+                                   mime=mime, use_container_width=True)
+        
+        with col2:
+            uploaded = st.file_uploader("📤 Upload", type=["json", "ndjson", "csv", "gz", "xz"])
+            mode = st.radio("Import as", ["Merge completions", "Restore backup"], horizontal=True, key="import_mode")
+            # Parsed only when the button is pressed, never on unrelated reruns
+            if uploaded and st.button("Import Uploaded", key="load_upload"):
+                uploaded.seek(0)
+                try:
+                    if mode == "Merge completions":
+                        events = list(export.read_completions(uploaded))
+                        with storage.profile_lock(current_profile()):
+                            result = export.merge_completions(user, events)
+                        save_user_data()
+                        st.success(f"✅ Merged {result['applied']} completions "
+                                   f"({result['duplicates']} already recorded, {result['skipped']} unknown quests, "
+                                   f"{result['archived']} archived days skipped)")
+                    else:
+                        set_profile(export.read_backup(uploaded))
+                        save_user_data()
+                        st.success("✅ Loaded!")
+                        st.rerun()
+                except (ValueError, EOFError, OSError, lzma.LZMAError) as e:
+                    # Truncated or corrupt gzip / xz uploads fail while reading
+                    st.error(f"Invalid file: {e}")
+
+
+if __name__ == "__main__":
+    render()
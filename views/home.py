@@ -0,0 +1,151 @@
+"""Home / dashboard page"""
+import streamlit as st
+
+import tracker_engine as engine
+from tracker_engine import CATEGORIES, CHALLENGE_RULES, DIFFICULTY_EXP, get_today_key
+from tracker_session import commit_event, get_completion_streak, get_today_completed
+
+
+def render_challenges():
+    """Today's daily challenges and the custom challenge form"""
+    user = st.session_state.user_data
+    today = get_today_key()
+    won = user.get("challenges_won", {})
+    custom = user.get("custom_challenges", {})
+    st.subheader("⚡ Daily Challenges")
+    for ch_id, challenge in engine.get_challenges(user).items():
+        record = won.get(ch_id, {})
+        status = "✅" if record.get("last") == today else "⭕"
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.write(f"{status} **{challenge['name']}** — {challenge['description']} "
+                     f"(+{challenge['reward']} EXP, won {record.get('count', 0)}×)")
+        with col2:
+            if ch_id in custom:
+                st.button("🗑️", key=f"delete_{ch_id}", on_click=commit_event,
+                          args=("delete_challenge",), kwargs={"ch_id": ch_id})
+
+    with st.expander("Create your own challenge"):
+        col1, col2 = st.columns(2)
+        with col1:
+            name = st.text_input("Challenge Name", placeholder="e.g., Lunch Sprint")
+            rule = st.selectbox("Rule", CHALLENGE_RULES, key="challenge_rule")
+        with col2:
+            reward = st.number_input("Reward EXP", min_value=5, value=40, step=5)
+            params = {}
+            if rule == "window":
+                params["count"] = st.number_input("Tasks", min_value=2, value=3, step=1)
+                params["seconds"] = st.number_input("Within minutes", min_value=1, value=60, step=5) * 60
+            elif rule == "streak":
+                params["days"] = st.number_input("Days in a row", min_value=2, value=7, step=1)
+            elif rule in ("before_hour", "after_hour"):
+                params["hour"] = st.number_input("Hour", min_value=0, max_value=23, value=12, step=1)
+        description = st.text_input("Description", placeholder="e.g., Complete 2 tasks in 30 minutes")
+
+        if st.button("⚡ Add Challenge", type="primary"):
+            if name:
+                commit_event("add_challenge", name=name, rule=rule, reward=reward,
+                             description=description or None, params=params)
+                st.success(f"Challenge '{name}' added!")
+                st.rerun()
+
+
+def render():
+    """Render the page body"""
+    if len(st.session_state.user_data["daily_tasks"]) == 0:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.warning("⚠️ No quests yet! Create your first quest to begin your journey!")
+        with col2:
+            if st.button("➕ Create First Quest", use_container_width=True):
+                st.switch_page("views/quests.py")
+    else:
+        # Stats row
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("📊 Tasks", len(st.session_state.user_data["daily_tasks"]))
+        
+        with col2:
+            today_completed = len(get_today_completed())
+            st.metric("✅ Today", f"{today_completed}/{len(st.session_state.user_data['daily_tasks'])}")
+        
+        with col3:
+            streak = get_completion_streak()
+            st.metric("🔥 Streak", f"{streak} days")
+        
+        with col4:
+            next_rank = engine.get_next_rank(st.session_state.user_data['rank'])
+            if next_rank:
+                pts_to_next = next_rank["min_points"] - st.session_state.user_data['rank_points']
+                st.metric("🎯 Next Rank", f"{pts_to_next} pts")
+            else:
+                st.metric("🎯 Next Rank", "MAX ✨")
+        
+        st.divider()
+        
+        # Streak visual
+        streak = get_completion_streak()
+        if streak >= 3:
+            st.markdown(f"""
+            <div class='streak-card'>
+            🔥 AMAZING! You're on a {streak}-day streak! 🔥
+            </div>
+            """, unsafe_allow_html=True)
+        elif streak >= 1:
+            st.markdown(f"""
+            <div class='milestone-card'>
+            ⭐ Great start! {streak} day streak going! Keep it up!
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.subheader("📋 Today's Quests")
+        today_tasks = set(get_today_completed())
+        completion_rate = (len(today_tasks) / len(st.session_state.user_data["daily_tasks"])) * 100
+        
+        st.progress(min(completion_rate / 100, 1.0), text=f"Progress: {completion_rate:.0f}%")
+        
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            selected_category = st.selectbox("Filter by Category", ["All"] + list(CATEGORIES.keys()), key="dashboard_filter")
+        
+        for task in st.session_state.user_data["daily_tasks"]:
+            if selected_category != "All" and task.get("category") != selected_category:
+                continue
+            
+            is_completed = task["id"] in today_tasks
+            color = "task-completed" if is_completed else "task-pending"
+            status = "✅" if is_completed else "⭕"
+            exp_amount = task["exp"] * DIFFICULTY_EXP.get(task["difficulty"], 1)
+            category_icon = CATEGORIES.get(task.get("category"), "📌")
+            
+            st.markdown(f"""
+            <div class='{color}'>
+                <b>{status} {task['name']}</b> {category_icon} - {int(exp_amount)} EXP [{task['difficulty'].upper()}]
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.divider()
+        
+        render_challenges()
+        
+        st.divider()
+        
+        # Charts; plotly is only loaded once there is something to plot
+        import tracker_charts as charts
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("📈 Level Progress")
+            fig = charts.level_progress_figure(st.session_state.user_data['experience'], st.session_state.user_data['exp_needed'])
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            st.subheader("🏆 Rank Progression")
+            fig = charts.rank_progression_figure(st.session_state.user_data['rank_points'])
+            st.plotly_chart(fig, use_container_width=True)
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,47 @@
+"""Leaderboard page: top players and your place, read from the leaderboard index"""
+import os
+
+import streamlit as st
+
+import tracker_storage as storage
+from tracker_leaderboard import METRICS
+from tracker_session import current_profile
+
+TOP_K = 10
+MEDALS = ["🥇", "🥈", "🥉"]
+
+
+def render():
+    """Render the page body"""
+    st.subheader("🏅 Leaderboard")
+    
+    metric = st.selectbox("Rank by", list(METRICS), format_func=METRICS.get, key="leaderboard_metric")
+    rows, place, players = storage.leaderboard_view(metric, current_profile(), TOP_K)
+    
+    if not rows:
+        st.info("💾 No saved profiles yet! Save yours to join the leaderboard.")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("👥 Players", players)
+    with col2:
+        st.metric("📍 Your Place", f"#{place}" if place else "—")
+    
+    st.divider()
+    
+    me = os.path.splitext(current_profile())[0]
+    for i, (name, score) in enumerate(rows):
+        badge = MEDALS[i] if i < len(MEDALS) else f"#{i + 1}"
+        line = f"{badge} **{name}** — {score:g} {METRICS[metric].split(' ', 1)[1]}"
+        if name == me:
+            st.success(line)
+        else:
+            st.write(line)
+    
+    if place and place > TOP_K:
+        st.caption(f"You are #{place} of {players} — keep going! ⚔️")
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,158 @@
+"""Quests page: daily quest list and quest creation"""
+from datetime import datetime
+
+import streamlit as st
+
+import tracker_engine as engine
+import tracker_trace as trace
+from tracker_engine import CATEGORIES, DIFFICULTY_COLORS, DIFFICULTY_EXP
+from tracker_session import (
+    commit_event,
+    get_completion_streak,
+    get_today_completed,
+    in_fragment_rerun,
+    render_header,
+)
+
+
+def _complete_task(task_id):
+    """Button callback: complete a quest and queue the row's feedback"""
+    leveled_up, achievements, challenges = commit_event("complete", task_id=task_id)
+    st.session_state.quest_feedback = (task_id, leveled_up, achievements, challenges)
+
+
+def _undo_task(task_id):
+    """Button callback: undo today's completion of a quest"""
+    if task_id in get_today_completed():
+        commit_event("undo", task_id=task_id)
+
+
+def _delete_task(task_id):
+    """Button callback: delete a quest"""
+    commit_event("delete_task", task_id=task_id)
+
+
+@st.fragment
+@trace.traced("fragment:quest_row", root=trace.rerun)
+def quest_row(task_id):
+    """One quest row; its buttons rerun only this row (and redraw the header)"""
+    task = engine.get_task_index(st.session_state.user_data).get(task_id)
+    if task is None:
+        return
+    
+    is_completed = task["id"] in get_today_completed()
+    exp_amount = task["exp"] * DIFFICULTY_EXP.get(task["difficulty"], 1)
+    category_icon = CATEGORIES.get(task.get("category"), "📌")
+    
+    col1, col2, col3, col4, col5 = st.columns([3, 1, 0.8, 0.8, 0.8])
+    
+    with col1:
+        difficulty_color = DIFFICULTY_COLORS.get(task["difficulty"], "#95a5a6")
+        status_icon = "✅" if is_completed else "⭕"
+        st.markdown(f"""
+        **{status_icon} {task['name']}** {category_icon}  
+        <span style='color: {difficulty_color}; font-weight: bold;'>[{task['difficulty'].upper()}]</span> - {int(exp_amount)} EXP
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.write(f"🎯 +{int(exp_amount)}" if not is_completed else "✨")
+    
+    with col3:
+        if not is_completed:
+            st.button("✅", key=f"task_{task['id']}", on_click=_complete_task, args=(task["id"],))
+        else:
+            st.write("✔️")
+    
+    with col4:
+        st.button("❌", key=f"undo_{task['id']}", on_click=_undo_task, args=(task["id"],))
+    
+    with col5:
+        st.button("🗑️", key=f"delete_{task['id']}", on_click=_delete_task, args=(task["id"],))
+    
+    feedback = st.session_state.get("quest_feedback")
+    if feedback and feedback[0] == task_id:
+        del st.session_state.quest_feedback
+        if feedback[1]:
+            st.balloons()
+        if feedback[2]:
+            st.success(f"🏆 Achievement unlocked!")
+        challenges = engine.get_challenges(st.session_state.user_data)
+        for ch_id in feedback[3]:
+            challenge = challenges[ch_id]
+            st.success(f"⚡ Challenge complete: {challenge['name']} (+{challenge['reward']} EXP)")
+    
+    if in_fragment_rerun():
+        render_header()
+
+
+def render():
+    """Render the page body"""
+    st.subheader("⚔️ Daily Quests")
+    st.write(f"**Current Date:** {datetime.now().strftime('%A, %B %d, %Y')}")
+    
+    today_completed = get_today_completed()
+    col1, col2, col3 = st.columns([2, 1, 1])
+    
+    with col1:
+        selected_category = st.selectbox("Filter by Category", ["All"] + list(CATEGORIES.keys()), key="quests_filter")
+    
+    with col2:
+        if len(st.session_state.user_data["daily_tasks"]) > 0:
+            completion_rate = (len(today_completed) / len(st.session_state.user_data["daily_tasks"])) * 100
+            st.metric("Completion", f"{completion_rate:.0f}%")
+    
+    with col3:
+        if st.button("📊 Summary"):
+            st.session_state.show_summary = not st.session_state.get("show_summary", False)
+    
+    if st.session_state.get("show_summary", False) and len(st.session_state.user_data["daily_tasks"]) > 0:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.info(f"**Tasks:** {len(today_completed)}")
+        with col2:
+            task_index = engine.get_task_index(st.session_state.user_data)
+            total_exp = sum(task_index[task_id]["exp"] * DIFFICULTY_EXP.get(task_index[task_id]["difficulty"], 1)
+                            for task_id in set(today_completed) if task_id in task_index)
+            st.info(f"**EXP:** {int(total_exp)}")
+        with col3:
+            st.info(f"**Streak:** {get_completion_streak()} 🔥")
+    
+    st.divider()
+    
+    if len(st.session_state.user_data["daily_tasks"]) == 0:
+        st.info("📝 No quests yet! Add your first quest below.")
+    else:
+        for task in st.session_state.user_data["daily_tasks"]:
+            if selected_category != "All" and task.get("category") != selected_category:
+                continue
+            quest_row(task["id"])
+    
+    st.divider()
+    
+    st.subheader("➕ Add New Quest")
+    with st.expander("Click to create a new quest"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            new_task_name = st.text_input("Quest Name", placeholder="e.g., Morning Run")
+        
+        with col2:
+            new_category = st.selectbox("Category", list(CATEGORIES.keys()), key="new_task_category")
+        
+        col3, col4 = st.columns(2)
+        
+        with col3:
+            new_difficulty = st.selectbox("Difficulty", ["common", "rare", "epic", "legendary"], key="new_task_difficulty")
+        
+        with col4:
+            new_exp = st.number_input("Base EXP", min_value=5, max_value=200, value=10, step=5)
+        
+        if st.button("✨ Add Quest", type="primary"):
+            if new_task_name:
+                commit_event("add_task", name=new_task_name, difficulty=new_difficulty, exp=new_exp, category=new_category)
+                st.success(f"Quest '{new_task_name}' added! ⚔️")
+                st.rerun()
+
+
+if __name__ == "__main__":
+    render()
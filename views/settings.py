@@ -0,0 +1,102 @@
+"""Settings page"""
+import sys
+
+import streamlit as st
+
+import tracker_engine as engine
+import tracker_scheduler as scheduler
+from tracker_engine import SEASONS
+from tracker_session import commit_event, profile_cache, save_user_data, set_profile, switch_profile
+
+
+def _switch_user():
+    """Username callback: move this session to that user's profile"""
+    switch_profile(st.session_state.username_field.strip())
+
+
+def render():
+    """Render the page body"""
+    st.subheader("⚙️ Settings")
+    
+    tab1, tab2 = st.tabs(["Profile", "Advanced"])
+    
+    with tab1:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("### Profile")
+            st.text_input("Username", st.session_state.get("username", ""), placeholder="Adventurer",
+                          key="username_field", on_change=_switch_user,
+                          help="Each username has its own saved profile")
+            if st.session_state.user_data.get("last_level_up"):
+                st.caption(f"Last level up: {st.session_state.user_data['last_level_up']}")
+        
+        with col2:
+            st.write("### Stats")
+            col_a, col_b = st.columns(2)
+            with col_a:
+                st.metric("Total EXP", st.session_state.user_data.get("total_exp_earned", 0))
+            with col_b:
+                st.metric("Days Active", len(engine.get_rollups(st.session_state.user_data)["per_day"]))
+    
+    with tab2:
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🔄 Reset Progress", type="secondary"):
+                if st.checkbox("Confirm reset"):
+                    set_profile(engine.new_user_data())
+                    save_user_data()
+                    st.rerun()
+        
+        with col2:
+            new_season = st.selectbox("Season", list(SEASONS.keys()))
+            if st.button("🎮 New Season", type="secondary"):
+                commit_event("season", season=new_season)
+                st.rerun()
+            for past in reversed(st.session_state.user_data.get("season_history", [])[-4:]):
+                st.caption(f"Season {past['season']} (ended {past['ended']}): level {past['level']}, "
+                           f"{past['rank']}, {past['season_exp']} EXP")
+        
+        # Only report on the chart module if a chart page already loaded it
+        charts = sys.modules.get("tracker_charts")
+        if charts:
+            chart_cache = charts.figure_cache_info()
+            st.caption(f"📈 Chart cache: {chart_cache['hits']} hits / {chart_cache['misses']} misses "
+                       f"({chart_cache['size']} cached, {chart_cache['evictions']} evicted)")
+        else:
+            st.caption("📈 Chart cache: not loaded yet")
+        
+        profiles = profile_cache().info()
+        st.caption(f"👥 Profile cache: {profiles['hits']} hits / {profiles['misses']} misses "
+                   f"({profiles['size']} cached, {profiles['evictions']} evicted)")
+        
+        jobs = scheduler.status()
+        if jobs["running"]:
+            st.caption(f"🕛 Day rollover: next at {jobs['next_run']}"
+                       + (f", last at {jobs['last_run']} ({jobs['rolled_over']} profiles)" if jobs["last_run"] else ""))
+        else:
+            st.caption("🕛 Day rollover: scheduler off, profiles roll over on first use")
+        
+        timing = st.session_state.get("startup_timing")
+        if timing:
+            st.caption(f"⏱️ Startup: imports {timing['import_ms']} ms, "
+                       f"{timing['first_page']} page {timing['page_ms']} ms, "
+                       f"first render {timing['first_render_ms']} ms")
+        
+        st.divider()
+        st.info("""
+        **Daily Tracker v5.0** 🚀
+        
+        ✨ Features:
+        - 🎮 8-Tier Ranking System
+        - 🏆 10+ Achievements
+        - 📊 Advanced Statistics
+        - 💾 Persistent Data Storage
+        - 🎁 Daily Bonus Rewards
+        - 📈 Progress Tracking
+        - 🔥 Streak Counter
+        - 💪 Motivation & Inspiration
+        """)
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,107 @@
+"""Statistics page"""
+from datetime import date, timedelta
+
+import streamlit as st
+
+import tracker_analytics as analytics
+import tracker_charts as charts
+import tracker_engine as engine
+import tracker_storage as storage
+from tracker_session import current_profile
+
+
+def render():
+    """Render the page body"""
+    st.subheader("📊 Statistics & History")
+    
+    # Old days may have moved to the cold archive, the counters still cover them
+    if not engine.get_rollups(st.session_state.user_data)["per_day"]:
+        st.info("📈 Complete some tasks to see stats!")
+    else:
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("📅 Days Active", len(engine.get_rollups(st.session_state.user_data)["per_day"]))
+        
+        with col2:
+            st.metric("✅ Total Completed", st.session_state.user_data.get("total_tasks_completed", 0))
+        
+        with col3:
+            st.metric("⭐ Total EXP", st.session_state.user_data.get("total_exp_earned", 0))
+        
+        with col4:
+            streaks = analytics.streak_summary(st.session_state.user_data)
+            st.metric("🔥 Best Streak", max(streaks["longest"], st.session_state.user_data.get("best_streak", 0)))
+        
+        st.divider()
+        
+        tab1, tab2, tab3, tab4, tab5 = st.tabs(["Activity", "Streaks", "Tasks", "Categories", "Look Back"])
+        
+        with tab1:
+            fig = charts.activity_figure(analytics.activity_rows(st.session_state.user_data, current_profile()))
+            st.plotly_chart(fig, use_container_width=True)
+            
+            today = date.today()
+            period = st.date_input("Calendar range", (today - timedelta(days=364), today), max_value=today,
+                                   key="calendar_range")
+            if isinstance(period, tuple) and len(period) == 2:
+                labels, grid = analytics.calendar_rows(st.session_state.user_data, *period, current_profile())
+                st.plotly_chart(charts.calendar_figure(labels, grid), use_container_width=True)
+        
+        with tab2:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("🏆 Longest Ever", f"{streaks['longest']} days")
+            with col2:
+                st.metric("🔥 Current Run", f"{streaks['current']} days")
+            with col3:
+                st.metric("📈 Streaks", streaks["runs"])
+            
+            if streaks["distribution"]:
+                st.write("**Streak lengths**")
+                st.plotly_chart(charts.streak_distribution_figure(streaks["distribution"]),
+                                use_container_width=True)
+                st.write("**Weekday completion rates**")
+                st.plotly_chart(charts.weekday_figure(analytics.weekday_rows(st.session_state.user_data)),
+                                use_container_width=True)
+        
+        with tab3:
+            task_rows = analytics.task_rows(st.session_state.user_data, current_profile())
+            
+            if engine.get_rollups(st.session_state.user_data)["per_day"] and task_rows:
+                fig = charts.task_figure(task_rows)
+                st.plotly_chart(fig, use_container_width=True)
+        
+        with tab4:
+            category_rows = analytics.category_rows(st.session_state.user_data, current_profile())
+            
+            if category_rows:
+                fig = charts.category_figure(category_rows)
+                st.plotly_chart(fig, use_container_width=True)
+        
+        with tab5:
+            today = date.today()
+            day = st.date_input("Profile as of", today - timedelta(days=30), max_value=today, key="look_back_day")
+            past = storage.profile_on(st.session_state.user_data, day.strftime(engine.DATE_FORMAT),
+                                      current_profile())
+            if past is None:
+                st.info("No checkpoint reaches back that far yet.")
+            else:
+                now = engine.profile_on(st.session_state.user_data, today.strftime(engine.DATE_FORMAT))
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("⭐ Level", past["level"], past["level"] - now["level"])
+                with col2:
+                    st.metric("⚔️ Total EXP", past["total_exp_earned"],
+                              past["total_exp_earned"] - now["total_exp_earned"])
+                with col3:
+                    st.metric("🏆 Rank Points", past["rank_points"], past["rank_points"] - now["rank_points"])
+                with col4:
+                    st.metric("✅ Completed", past["total_tasks_completed"],
+                              past["total_tasks_completed"] - now["total_tasks_completed"])
+                st.caption(f"{past['achievements']} achievements, best streak {past['best_streak']} days; "
+                           "differences are against today.")
+
+
+if __name__ == "__main__":
+    render()